@@ -1,6 +1,10 @@
 """Main Fantasy Football Agent using Google ADK."""
 import asyncio
+import inspect
+import json
 import logging
+import os
+import traceback
 from typing import List, Dict, Any, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -44,10 +48,10 @@ except ImportError:
         CallbackContext = Any  # type: ignore
         logging.warning("Google ADK not found. Using fallback implementation.")
 
-import google.generativeai as genai
+from dotenv import load_dotenv
 
 from app.utils.config import settings
-from app.utils.tools.analysis_tools import AnalysisTools
+from app.utils.tools.analysis_tools import default_analysis_tools
 from app.utils.league_memory import LeagueRulesMemory
 from app.utils.tools.league_rules_tool import LeagueRulesTool
 
@@ -73,17 +77,19 @@ try:
     from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
     from mcp import StdioServerParameters
     MCP_AVAILABLE = True
+    # Older ADK releases re-list MCP tools on every turn with no way to cache
+    MCP_TOOL_LIST_CACHE_SUPPORTED = (
+        'tool_list_cache_ttl_seconds' in inspect.signature(McpToolset.__init__).parameters
+    )
 except ImportError:
     MCP_AVAILABLE = False
+    MCP_TOOL_LIST_CACHE_SUPPORTED = False
     # Logger will be defined below
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configure Gemini API
-genai.configure(api_key=settings.gemini_api_key)
-
 
 class FantasyFootballAgent(Agent):
     """Main agent for managing Yahoo Fantasy Football team.
@@ -134,21 +140,14 @@ class FantasyFootballAgent(Agent):
         # Initialize league rules tool for discovering and managing league settings
         league_rules_tool = LeagueRulesTool(memory=self._league_memory)
         
-        # Initialize analysis tools (LLM-based)
-        analysis_tools = AnalysisTools()
-        
-        # Collect all tools
+        # Collect all tools (analysis tools are a shared module-level instance)
         all_tools = [
-            *analysis_tools.get_tools(),
+            *default_analysis_tools.get_tools(),
             *league_rules_tool.get_tools(),
         ]
         
         # Add MCP toolsets if available
         if MCP_AVAILABLE:
-            import os
-            import json
-            from dotenv import load_dotenv
-            
             # Load environment variables from .env file
             project_root = os.path.dirname(os.path.dirname(__file__))
             env_path = os.path.join(project_root, '.env')
@@ -168,6 +167,13 @@ class FantasyFootballAgent(Agent):
                 with open(mcp_config_path, 'r') as f:
                     mcp_config = json.load(f)
                 
+                # Both servers' tool schemas are static for the life of the
+                # process, so reuse each tools/list response instead of
+                # re-listing before every model turn
+                toolset_options = {}
+                if MCP_TOOL_LIST_CACHE_SUPPORTED and settings.mcp_tool_list_cache_ttl_seconds > 0:
+                    toolset_options['tool_list_cache_ttl_seconds'] = settings.mcp_tool_list_cache_ttl_seconds
+                
                 # Add Yahoo Fantasy MCP server
                 if 'yahoo-fantasy' in mcp_config.get('mcpServers', {}):
                     yahoo_config = mcp_config['mcpServers']['yahoo-fantasy']
@@ -255,14 +261,14 @@ class FantasyFootballAgent(Agent):
                     try:
                         yahoo_toolset = McpToolset(
                             connection_params=yahoo_connection,
-                            tool_name_prefix='yahoo_'
+                            tool_name_prefix='yahoo_',
+                            **toolset_options
                         )
                         all_tools.append(yahoo_toolset)
                         logger.info("Yahoo Fantasy MCP toolset added successfully")
                     except Exception as e:
                         logger.error(f"Failed to create Yahoo Fantasy MCP toolset: {e}")
                         logger.error("Yahoo Fantasy MCP will not be available")
-                        import traceback
                         logger.debug(traceback.format_exc())
                 
                 # Add Browser MCP server
@@ -284,7 +290,8 @@ class FantasyFootballAgent(Agent):
                         
                         browser_toolset = McpToolset(
                             connection_params=browser_connection,
-                            tool_name_prefix='browser_'
+                            tool_name_prefix='browser_',
+                            **toolset_options
                         )
                         all_tools.append(browser_toolset)
                         logger.info("Browser MCP toolset added successfully")
@@ -296,7 +303,6 @@ class FantasyFootballAgent(Agent):
                         logger.info("  1. Browser MCP Chrome extension is installed: https://browsermcp.io/install")
                         logger.info("  2. Node.js is installed (for npx)")
                         logger.info("  3. Package @browsermcp/mcp is accessible via npx")
-                        import traceback
                         logger.debug(traceback.format_exc())
             else:
                 logger.warning(f"MCP config not found at {mcp_config_path}")
@@ -356,8 +362,10 @@ class FantasyFootballAgent(Agent):
             )
         
         # Store tool instances for direct method calls
-        self._analysis_tools = analysis_tools
+        self._analysis_tools = default_analysis_tools
         self._league_rules_tool = league_rules_tool
+        # Pydantic resets private state in super().__init__, so re-attach it
+        self._league_memory = league_rules_tool.memory
         # Note: Yahoo and Browser tools are now MCP toolsets, not direct instances
         # They're accessible via the agent's tools list
         
@@ -516,6 +524,10 @@ class FantasyFootballAgent(Agent):
     def memory_service(self) -> Optional[BaseMemoryService]:
         """Get the ADK memory service instance."""
         return self._memory_service
+
+    async def aclose(self) -> None:
+        """Persist pending league rules; await before the event loop shuts down."""
+        await self._league_memory.flush()
     
     def _get_agent_instruction(self) -> str:
         """Get the main instruction for the agent."""
@@ -1023,13 +1035,18 @@ IMPORTANT RULES:
         """Run all weekly management tasks."""
         logger.info("Running weekly management tasks")
         
-        results = {
-            'lineup_optimization': await self.optimize_lineup(),
-            'waiver_wire': await self.evaluate_waiver_wire(),
-            'trades': await self.evaluate_trades(),
-        }
+        # The three tasks are independent, so run them concurrently
+        lineup, waivers, trades = await asyncio.gather(
+            self.optimize_lineup(),
+            self.evaluate_waiver_wire(),
+            self.evaluate_trades(),
+        )
         
-        return results
+        return {
+            'lineup_optimization': lineup,
+            'waiver_wire': waivers,
+            'trades': trades,
+        }
 
 
 # Create agent instance (shared across runner + ADK web)
@@ -1,54 +1,76 @@
 """Configuration management for the Fantasy Football Agent."""
-import os
+from functools import lru_cache
 from typing import Optional
-from pydantic_settings import BaseSettings
+
 from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore",
+    )
     
     # Google Gemini API
-    gemini_api_key: str = Field(..., env="GEMINI_API_KEY")
+    gemini_api_key: str = Field(..., validation_alias="GEMINI_API_KEY")
     
     # Yahoo Fantasy Football API
-    yahoo_consumer_key: Optional[str] = Field(None, env="YAHOO_CONSUMER_KEY")
-    yahoo_consumer_secret: Optional[str] = Field(None, env="YAHOO_CONSUMER_SECRET")
-    yahoo_league_id: Optional[str] = Field(None, env="YAHOO_LEAGUE_ID")
-    yahoo_game_id: int = Field(449, env="YAHOO_GAME_ID")  # NFL default
+    yahoo_consumer_key: Optional[str] = Field(None, validation_alias="YAHOO_CONSUMER_KEY")
+    yahoo_consumer_secret: Optional[str] = Field(None, validation_alias="YAHOO_CONSUMER_SECRET")
+    yahoo_league_id: Optional[str] = Field(None, validation_alias="YAHOO_LEAGUE_ID")
+    yahoo_game_id: int = Field(449, validation_alias="YAHOO_GAME_ID")  # NFL default
     
     # Yahoo OAuth Tokens (for MCP server)
-    yahoo_access_token: Optional[str] = Field(None, env="YAHOO_ACCESS_TOKEN")
-    yahoo_refresh_token: Optional[str] = Field(None, env="YAHOO_REFRESH_TOKEN")
-    yahoo_guid: Optional[str] = Field(None, env="YAHOO_GUID")
+    yahoo_access_token: Optional[str] = Field(None, validation_alias="YAHOO_ACCESS_TOKEN")
+    yahoo_refresh_token: Optional[str] = Field(None, validation_alias="YAHOO_REFRESH_TOKEN")
+    yahoo_guid: Optional[str] = Field(None, validation_alias="YAHOO_GUID")
     
     # Yahoo Account (for browser automation)
-    yahoo_email: Optional[str] = Field(None, env="YAHOO_EMAIL")
-    yahoo_password: Optional[str] = Field(None, env="YAHOO_PASSWORD")
+    yahoo_email: Optional[str] = Field(None, validation_alias="YAHOO_EMAIL")
+    yahoo_password: Optional[str] = Field(None, validation_alias="YAHOO_PASSWORD")
     
     # ADK Configuration
-    adk_project_id: str = Field("football-agent", env="ADK_PROJECT_ID")
-    adk_region: str = Field("us-central1", env="ADK_REGION")
+    adk_project_id: str = Field("football-agent", validation_alias="ADK_PROJECT_ID")
+    adk_region: str = Field("us-central1", validation_alias="ADK_REGION")
     
     # ADK Web Server Port
-    adk_web_port: int = Field(8080, env="ADK_WEB_PORT")
+    adk_web_port: int = Field(8080, validation_alias="ADK_WEB_PORT")
     
     # MCP Server URLs (for HTTP transport if needed)
     # Note: MCP servers use stdio by default, these are only for HTTP transport
-    mcp_yahoo_server_url: str = Field("http://localhost:8001", env="MCP_YAHOO_SERVER_URL")
-    mcp_browser_server_url: str = Field("http://localhost:8002", env="MCP_BROWSER_SERVER_URL")
+    mcp_yahoo_server_url: str = Field("http://localhost:8001", validation_alias="MCP_YAHOO_SERVER_URL")
+    mcp_browser_server_url: str = Field("http://localhost:8002", validation_alias="MCP_BROWSER_SERVER_URL")
     
     # Model configuration
     # Using gemini-2.5-pro for function calling support (required for ADK FunctionTools)
-    model_name: str = Field("gemini-2.5-pro", env="MODEL_NAME")
-    temperature: float = Field(0.7, env="TEMPERATURE")
-    
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
+    model_name: str = Field("gemini-2.5-pro", validation_alias="MODEL_NAME")
+    # Smaller model for trade/waiver evaluations; low-confidence answers are
+    # re-asked on the strong model (defaults to model_name when unset)
+    fast_model_name: str = Field("gemini-2.5-flash-lite", validation_alias="FAST_MODEL_NAME")
+    strong_model_name: Optional[str] = Field(None, validation_alias="STRONG_MODEL_NAME")
+    temperature: float = Field(0.7, validation_alias="TEMPERATURE")
+    # Maximum number of in-flight Gemini requests issued by the analysis tools
+    max_concurrent_llm: int = Field(4, validation_alias="MAX_CONCURRENT_LLM")
+
+    # Include human-oriented notes in browser tool results (adds tokens per turn)
+    debug_browser_tool_output: bool = Field(False, validation_alias="DEBUG_BROWSER_TOOL_OUTPUT")
+
+    # How long MCP tool listings are reused before asking the server again
+    # (0 re-lists before every model turn)
+    mcp_tool_list_cache_ttl_seconds: float = Field(3600.0, validation_alias="MCP_TOOL_LIST_CACHE_TTL_SECONDS")
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings instance (.env is parsed once, here)."""
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
 
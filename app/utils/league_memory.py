@@ -1,21 +1,91 @@
 """League rules memory management aligned with ADK MemoryService best practices."""
+import asyncio
 import json
 import logging
+import os
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from google.adk.events.event import Event
 from google.adk.memory.base_memory_service import BaseMemoryService
 from google.adk.sessions.session import Session
 from google.genai import types as genai_types
 
+from app.utils.roster import (
+    SUPERFLEX_POSITIONS,
+    normalize_roster_positions,
+    split_roster_positions,
+)
+
 logger = logging.getLogger(__name__)
 
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+MEMORY_FILENAME = ".league_rules_memory.json"
+
+# Quiet period after the last store before the memory file is rewritten, so a
+# burst of store_league_rules calls results in a single disk write.
+SAVE_DEBOUNCE_SECONDS = 0.2
+
+
+# league_info keys copied verbatim into the stored rules; only the remaining keys
+# are kept under "raw_extra" so nothing is persisted twice.
+_EXTRACTED_KEYS = frozenset({
+    "scoring_type",
+    "roster_positions",
+    "scoring_settings",
+    "position_eligibility",
+    "num_teams",
+    "season",
+    "discovered_at",
+})
+
+_SCORING_NOTES = {
+    "ppr": "⚠️ PPR League: Pass-catching players are MORE valuable\n",
+    "half": "⚠️ Half-PPR League: Pass-catchers get moderate boost\n",
+    "standard": "→ Standard scoring: TD-dependent players prioritized\n",
+}
+
+
+async def _wait_any(*events: asyncio.Event, timeout: Optional[float] = None) -> None:
+    """Return once any of the events is set, or after timeout seconds."""
+    waiters = [asyncio.ensure_future(event.wait()) for event in events]
+    try:
+        await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+
 
 def _build_content(text: str) -> genai_types.Content:
     return genai_types.Content(role="assistant", parts=[genai_types.Part(text=text)])
 
 
+def _precompute_rules(roster_positions: Any, scoring_type: Optional[str]) -> Dict[str, Any]:
+    """Derive the roster and scoring summary prompts need, once per stored league.
+
+    position_counts holds the canonically ordered starting slots (bench and IR excluded).
+    """
+    position_counts, bench_count = split_roster_positions(
+        normalize_roster_positions(roster_positions)
+    )
+
+    scoring_lower = (scoring_type or "").lower()
+    # "Half-PPR" also contains "ppr", so the half check must come first
+    if "half" in scoring_lower or "0.5" in scoring_lower:
+        scoring_flag = "half"
+    elif "ppr" in scoring_lower:
+        scoring_flag = "ppr"
+    else:
+        scoring_flag = "standard"
+
+    return {
+        "position_counts": position_counts,
+        "bench_count": bench_count,
+        "scoring_flag": scoring_flag,
+    }
+
+
 class LeagueRulesMemory:
     """Stores league rules locally and synchronizes them with an ADK MemoryService."""
 
@@ -25,19 +95,27 @@ class LeagueRulesMemory:
         *,
         memory_service: Optional[BaseMemoryService] = None,
         app_name: str = "football-agent",
+        pretty: bool = False,
     ):
-        if storage_dir is None:
-            project_root = Path(__file__).parent.parent.parent
-            storage_dir = str(project_root)
-
-        self.storage_dir = Path(storage_dir)
-        self.memory_file = self.storage_dir / ".league_rules_memory.json"
+        self.storage_dir = PROJECT_ROOT if storage_dir is None else Path(storage_dir)
+        self.memory_file = self.storage_dir / MEMORY_FILENAME
         self.storage_dir.mkdir(parents=True, exist_ok=True)
 
-        self._session_cache: Dict[str, Dict[str, Any]] = {}
         self._memory: Dict[str, Dict[str, Any]] = self._load_memory()
+        self._session_cache: Dict[str, Dict[str, Any]] = dict(self._memory)
+        self._known_ids: Set[str] = set(self._memory)
+        self._formatted_cache: Dict[str, str] = {}
         self._memory_service = memory_service
         self._app_name = app_name
+        # The memory file is machine-read; indentation is opt-in for debugging.
+        self._json_format: Dict[str, Any] = (
+            {"indent": 2} if pretty else {"separators": (",", ":")}
+        )
+
+        self._save_lock = threading.Lock()
+        self._dirty: Optional[asyncio.Event] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._flusher_task: Optional[asyncio.Task] = None
 
     def _load_memory(self) -> Dict[str, Dict[str, Any]]:
         if not self.memory_file.exists():
@@ -47,6 +125,12 @@ class LeagueRulesMemory:
         try:
             with open(self.memory_file, "r") as f:
                 memory = json.load(f)
+            # Rebuild derived summaries so files written by older versions
+            # don't keep a stale or missing _precomputed block
+            for rules in memory.values():
+                rules["_precomputed"] = _precompute_rules(
+                    rules.get("roster_positions", []), rules.get("scoring_type")
+                )
             logger.info(f"Loaded league rules memory for {len(memory)} league(s)")
             return memory
         except Exception as e:
@@ -54,26 +138,91 @@ class LeagueRulesMemory:
             return {}
 
     def _save_memory(self) -> None:
+        # Write to a sibling temp file and rename over the original so a crash
+        # mid-write never leaves a truncated memory file behind.
+        tmp_file = self.memory_file.with_suffix(".json.tmp")
         try:
-            with open(self.memory_file, "w") as f:
-                json.dump(self._memory, f, indent=2)
+            with self._save_lock:
+                # Entries are replaced rather than mutated, so a shallow copy is a
+                # consistent snapshot even while the event loop keeps storing rules.
+                snapshot = dict(self._memory)
+                with open(tmp_file, "w") as f:
+                    json.dump(snapshot, f, **self._json_format)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.memory_file)
             logger.info(f"Saved league rules memory to {self.memory_file}")
         except Exception as e:
             logger.error(f"Error saving league rules memory: {e}")
 
+    def _schedule_save(self) -> None:
+        """Mark memory dirty so the background flusher persists it shortly."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (sync caller) - nothing to debounce against.
+            self._save_memory()
+            return
+
+        task = self._flusher_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            # Event and flusher are bound to the loop that first needs them.
+            self._dirty = asyncio.Event()
+            self._closing = asyncio.Event()
+            self._flusher_task = loop.create_task(self._flusher(self._dirty, self._closing))
+        self._dirty.set()
+
+    async def _flusher(self, dirty: asyncio.Event, closing: asyncio.Event) -> None:
+        try:
+            while not closing.is_set():
+                await _wait_any(dirty, closing)
+                if not closing.is_set():
+                    # Let a burst of stores settle into one write; flush() ends this early
+                    await _wait_any(closing, timeout=SAVE_DEBOUNCE_SECONDS)
+                if dirty.is_set():
+                    dirty.clear()
+                    await asyncio.to_thread(self._save_memory)
+        except asyncio.CancelledError:
+            # asyncio.run cancels pending tasks when its loop ends; write out
+            # anything still waiting on the debounce before going away.
+            if dirty.is_set():
+                dirty.clear()
+                self._save_memory()
+            raise
+
+    def _is_dirty(self) -> bool:
+        return self._dirty is not None and self._dirty.is_set()
+
+    async def flush(self) -> None:
+        """Persist any pending changes immediately and stop the background flusher."""
+        task = self._flusher_task
+        if task is not None:
+            if not task.done() and task.get_loop() is asyncio.get_running_loop():
+                # Ask the flusher to finish any save in progress and exit;
+                # cancelling would leave that save running in its thread
+                self._closing.set()
+                await task
+            self._flusher_task = None
+        if self._is_dirty():
+            self._dirty.clear()
+            await asyncio.to_thread(self._save_memory)
+
     def _normalize_rules(self, league_id: str, league_info: Dict[str, Any]) -> Dict[str, Any]:
         league_name = league_info.get("league") or league_info.get("name", "")
+        roster_positions = league_info.get("roster_positions", [])
+        scoring_type = league_info.get("scoring_type", "Unknown")
         return {
             "league_id": league_id,
-            "scoring_type": league_info.get("scoring_type", "Unknown"),
-            "roster_positions": league_info.get("roster_positions", []),
+            "scoring_type": scoring_type,
+            "roster_positions": roster_positions,
             "scoring_settings": league_info.get("scoring_settings", {}),
             "position_eligibility": league_info.get("position_eligibility", {}),
             "num_teams": league_info.get("num_teams"),
             "season": league_info.get("season"),
             "league_name": league_name,
             "discovered_at": league_info.get("discovered_at"),
-            "raw_data": league_info,
+            "raw_extra": {k: v for k, v in league_info.items() if k not in _EXTRACTED_KEYS},
+            "_precomputed": _precompute_rules(roster_positions, scoring_type),
         }
 
     async def store_league_rules(self, league_id: str, league_info: Dict[str, Any]) -> bool:
@@ -81,7 +230,9 @@ class LeagueRulesMemory:
             stored_rules = self._normalize_rules(league_id, league_info)
             self._memory[league_id] = stored_rules
             self._session_cache[league_id] = stored_rules
-            self._save_memory()
+            self._known_ids.add(league_id)
+            self._formatted_cache.pop(league_id, None)
+            self._schedule_save()
 
             if self._memory_service:
                 await self._ingest_into_memory_service(league_id, stored_rules)
@@ -111,15 +262,21 @@ class LeagueRulesMemory:
         await self._memory_service.add_session_to_memory(session)
 
     def get_league_rules(self, league_id: str) -> Optional[Dict[str, Any]]:
-        if league_id in self._session_cache:
-            return self._session_cache[league_id]
-        rules = self._memory.get(league_id)
-        if rules:
-            self._session_cache[league_id] = rules
-        return rules
+        return self._session_cache.get(league_id)
+
+    def get_raw_league_info(self, league_id: str) -> Optional[Dict[str, Any]]:
+        """Rebuild the league_info payload the rules were stored from."""
+        rules = self.get_league_rules(league_id)
+        if not rules:
+            return None
+        if "raw_data" in rules:  # stored before raw_extra replaced raw_data
+            return rules["raw_data"]
+        raw = {key: rules[key] for key in _EXTRACTED_KEYS if key in rules}
+        raw.update(rules.get("raw_extra", {}))
+        return raw
 
     def has_league_rules(self, league_id: str) -> bool:
-        return self.get_league_rules(league_id) is not None
+        return league_id in self._known_ids
 
     def get_all_leagues(self) -> Dict[str, Dict[str, Any]]:
         return self._memory.copy()
@@ -128,43 +285,45 @@ class LeagueRulesMemory:
         if league_id:
             self._memory.pop(league_id, None)
             self._session_cache.pop(league_id, None)
+            self._known_ids.discard(league_id)
+            self._formatted_cache.pop(league_id, None)
         else:
             self._memory.clear()
             self._session_cache.clear()
-        self._save_memory()
+            self._known_ids.clear()
+            self._formatted_cache.clear()
+        self._schedule_save()
 
     def format_rules_for_agent(self, league_id: str) -> str:
         rules = self.get_league_rules(league_id)
         if not rules:
             return ""
 
-        formatted = f"\n=== LEAGUE RULES (League: {rules.get('league_name', league_id)}) ===\n"
-        formatted += f"Scoring Type: {rules.get('scoring_type', 'Unknown')}\n"
+        cached = self._formatted_cache.get(league_id)
+        if cached is not None:
+            return cached
 
-        scoring_type = rules.get("scoring_type", "").lower()
-        if "ppr" in scoring_type:
-            formatted += "⚠️ PPR League: Pass-catching players are MORE valuable\n"
-        elif "half" in scoring_type:
-            formatted += "⚠️ Half-PPR League: Pass-catchers get moderate boost\n"
-        else:
-            formatted += "→ Standard scoring: TD-dependent players prioritized\n"
-
-        roster_positions = rules.get("roster_positions", [])
-        if roster_positions:
-            formatted += "\nRoster Positions:\n"
-            position_counts: Dict[str, int] = {}
-            for pos in roster_positions:
-                pos_name = pos.get("position") if isinstance(pos, dict) else str(pos)
-                count = pos.get("count", 1) if isinstance(pos, dict) else 1
-                if pos_name and pos_name.upper() not in ["BN", "BE", "BENCH", "IR"]:
-                    position_counts[pos_name] = position_counts.get(pos_name, 0) + count
-
-            for pos, count in sorted(position_counts.items()):
-                formatted += f"  - {pos}: {count}\n"
-                if pos.upper() in ["SUPERFLEX", "OP"]:
-                    formatted += "    ⚠️ SUPERFLEX: QBs are MUCH more valuable!\n"
-
-        formatted += "\n"
+        # Rules stored before precomputation existed are summarized on first use.
+        precomputed = rules.get("_precomputed") or _precompute_rules(
+            rules.get("roster_positions", []), rules.get("scoring_type")
+        )
+
+        parts = [
+            f"\n=== LEAGUE RULES (League: {rules.get('league_name', league_id)}) ===\n",
+            f"Scoring Type: {rules.get('scoring_type', 'Unknown')}\n",
+            _SCORING_NOTES[precomputed["scoring_flag"]],
+        ]
+
+        if rules.get("roster_positions"):
+            parts.append("\nRoster Positions:\n")
+            for pos, count in precomputed["position_counts"]:
+                parts.append(f"  - {pos}: {count}\n")
+                if pos.upper() in SUPERFLEX_POSITIONS:
+                    parts.append("    ⚠️ SUPERFLEX: QBs are MUCH more valuable!\n")
+
+        parts.append("\n")
+        formatted = "".join(parts)
+        self._formatted_cache[league_id] = formatted
         return formatted
 
     def search_league_rules(self, query: str) -> List[Dict[str, Any]]:
@@ -0,0 +1,56 @@
+"""Canonical roster-slot handling shared by league memory and the analysis tools."""
+from typing import Any, Dict, List, Tuple
+
+# Roster slot groups, matched against upper-cased position names
+BENCH_POSITIONS = frozenset({'BN', 'BE', 'BENCH'})
+IR_POSITIONS = frozenset({'IR', 'INJURED'})
+SUPERFLEX_POSITIONS = frozenset({'SUPERFLEX', 'OP', 'OFFENSIVE PLAYER'})
+IDP_POSITIONS = frozenset({'IDP', 'IDP_FLEX'})
+
+# Display order for the common slots; anything else follows alphabetically
+CANONICAL_POSITIONS = ('QB', 'RB', 'WR', 'TE', 'FLEX', 'SUPERFLEX', 'OP', 'K', 'DEF', 'DST', 'IDP', 'BN', 'IR')
+_CANONICAL_SET = frozenset(CANONICAL_POSITIONS)
+
+
+def normalize_roster_positions(roster_positions: Any) -> Dict[str, int]:
+    """Canonical {position: count} form of a roster_positions value.
+
+    Accepts the dict form or Yahoo's list of ``{'position', 'count'}`` entries
+    (bare position strings count as one slot).
+    """
+    if isinstance(roster_positions, dict):
+        return roster_positions
+    position_dict: Dict[str, int] = {}
+    if isinstance(roster_positions, list):
+        for pos in roster_positions:
+            if isinstance(pos, dict):
+                pos_name = pos.get('position', pos.get('type', 'Unknown'))
+                count = pos.get('count', 1)
+            else:
+                pos_name = str(pos)
+                count = 1
+            position_dict[pos_name] = position_dict.get(pos_name, 0) + count
+    return position_dict
+
+
+def split_roster_positions(roster_positions: Any) -> Tuple[List[Tuple[str, int]], int]:
+    """Split roster slots into canonically ordered starting positions and a bench total.
+
+    IR slots and empty slots are dropped from both.
+    """
+    position_dict = normalize_roster_positions(roster_positions)
+    ordered = [pos for pos in CANONICAL_POSITIONS if pos in position_dict]
+    if len(ordered) < len(position_dict):
+        ordered.extend(sorted(position_dict.keys() - _CANONICAL_SET))
+    starting_positions: List[Tuple[str, int]] = []
+    bench_count = 0
+    for pos in ordered:
+        count = position_dict[pos]
+        if not count:
+            continue
+        pos_upper = pos.upper()
+        if pos_upper in BENCH_POSITIONS:
+            bench_count += count
+        elif pos_upper not in IR_POSITIONS:
+            starting_positions.append((pos, count))
+    return starting_positions, bench_count
@@ -1,60 +1,125 @@
 """Analysis tools using LLM for decision making."""
+import asyncio
+import hashlib
+import heapq
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import random
+import time
+from collections import OrderedDict
+from functools import cache, lru_cache
+from typing import AsyncIterator, List, Dict, Any, Literal, Optional, Tuple
 from google.adk.tools import FunctionTool
+from google.api_core import exceptions as google_exceptions
 import google.generativeai as genai
+from pydantic import BaseModel, Field, ValidationError
 
 from app.utils.config import settings
+from app.utils.roster import (
+    IDP_POSITIONS,
+    SUPERFLEX_POSITIONS,
+    split_roster_positions,
+)
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - optional dependency
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
-# Configure Gemini
-genai.configure(api_key=settings.gemini_api_key)
-model = genai.GenerativeModel(settings.model_name)
+# Decodes a JSON object in place from an offset, for responses wrapped in prose
+_DECODER = json.JSONDecoder()
 
 
-class AnalysisTools:
-    """Tools for LLM-based analysis and decision making."""
-    
-    def get_tools(self) -> List[FunctionTool]:
-        """Get all analysis tools."""
-        return [
-            FunctionTool(func=self.optimize_lineup),
-            FunctionTool(func=self.evaluate_waiver_wire),
-            FunctionTool(func=self.evaluate_trade),
-            FunctionTool(func=self.propose_trades),
-        ]
-    
-    async def optimize_lineup(
-        self,
-        team_data: Dict[str, Any],
-        league_settings: Dict[str, Any],
-        matchup: Dict[str, Any],
-        player_research: Dict[str, Any],
-        week: int
-    ) -> Dict[str, Any]:
-        """Optimize lineup using LLM analysis."""
-        try:
-            prompt = f"""
-You are analyzing a Fantasy Football lineup for Week {week}.
+@cache
+def _configure() -> None:
+    """Configure the Gemini SDK once, on first use rather than at import."""
+    genai.configure(api_key=settings.gemini_api_key)
 
-⚠️ CRITICAL: You MUST use the league settings below - NEVER make generic recommendations!
 
-TEAM DATA:
-{self._format_team_data(team_data)}
+class LineupChange(BaseModel):
+    player_id: str
+    action: Literal["start", "bench", "move"]
+    position: str
+    reasoning: str
 
-LEAGUE SETTINGS (USE THESE EXACT RULES - DO NOT ASSUME STANDARD SETTINGS):
-{self._format_league_settings(league_settings)}
 
-MATCHUP:
-Opponent: {matchup.get('opponent', 'TBD')}
-Current Score: {matchup.get('my_score', 0)} vs {matchup.get('opponent_score', 0)}
+class LineupDecision(BaseModel):
+    """Structured response for optimize_lineup."""
+
+    recommended_changes: List[LineupChange]
+    changes_needed: bool
+    confidence: float = Field(description="Confidence from 0.0 to 1.0")
+    summary: str
+
+
+class WaiverDecision(BaseModel):
+    """Structured response for evaluate_waiver_wire."""
+
+    should_pickup: bool
+    player_id: Optional[str]
+    drop_player_id: Optional[str]
+    reasoning: str
+    priority: Literal["high", "medium", "low"]
+    confidence: float = Field(description="Confidence from 0.0 to 1.0")
 
-PLAYER RESEARCH:
-{self._format_player_research(player_research)}
 
-Based on this information, analyze the optimal lineup considering:
-1. **CRITICAL**: Use the EXACT league-specific scoring rules from above (PPR vs Standard significantly affects player values)
+class TradeEvaluation(BaseModel):
+    """Structured response for evaluate_trade."""
+
+    should_accept: bool
+    reasoning: str
+    value_difference: Literal["favorable", "neutral", "unfavorable"]
+    confidence: float = Field(description="Confidence from 0.0 to 1.0")
+
+
+class TradeProposal(BaseModel):
+    target_team: str
+    players_to_give: List[str] = Field(description="Player IDs to give away")
+    players_to_receive: List[str] = Field(description="Player IDs to receive")
+    reasoning: str
+    priority: Literal["high", "medium", "low"]
+
+
+class TradeProposals(BaseModel):
+    """Structured response for propose_trades (1-3 proposals)."""
+
+    proposed_trades: List[TradeProposal]
+
+
+# Sampling for the analysis tools: near-deterministic so repeated evaluations
+# agree (and hit the response cache), with output capped per tool schema.
+ANALYSIS_TEMPERATURE = 0.2
+ANALYSIS_TOP_P = 0.9
+
+
+def _json_config(schema: type, max_output_tokens: int) -> genai.types.GenerationConfig:
+    """Generation config that makes Gemini return JSON matching ``schema``."""
+    return genai.types.GenerationConfig(
+        response_mime_type="application/json",
+        response_schema=schema,
+        max_output_tokens=max_output_tokens,
+        temperature=ANALYSIS_TEMPERATURE,
+        top_p=ANALYSIS_TOP_P,
+    )
+
+
+_LINEUP_CONFIG = _json_config(LineupDecision, max_output_tokens=800)
+_WAIVER_CONFIG = _json_config(WaiverDecision, max_output_tokens=400)
+_TRADE_CONFIG = _json_config(TradeEvaluation, max_output_tokens=300)
+_PROPOSE_CONFIG = _json_config(TradeProposals, max_output_tokens=600)
+
+# Static role and analysis instructions, sent once per model as the system
+# instruction so each request only carries the team/league/matchup data.
+_LINEUP_SYSTEM = """You are analyzing a Fantasy Football lineup for the given week.
+
+⚠️ CRITICAL: You MUST use the EXACT rules in the LEAGUE SETTINGS section (DO NOT ASSUME STANDARD SETTINGS) - NEVER make generic recommendations!
+
+Analyze the optimal lineup considering:
+1. **CRITICAL**: Use the EXACT league-specific scoring rules provided (PPR vs Standard significantly affects player values)
    - If PPR: Prioritize players with high reception counts
    - If Standard: Prioritize TD-dependent players
    - Use the scoring_settings from league_settings to calculate player values accurately
@@ -79,59 +144,14 @@ Provide:
 2. Players to bench with reasoning
 3. Any position swaps needed
 4. Confidence level for each decision
-
-Format your response as JSON with the following structure:
-{{
-    "recommended_changes": [
-        {{
-            "player_id": "...",
-            "action": "start|bench|move",
-            "position": "...",
-            "reasoning": "..."
-        }}
-    ],
-    "changes_needed": true/false,
-    "confidence": 0.0-1.0,
-    "summary": "..."
-}}
 """
-            
-            response = model.generate_content(prompt)
-            result = self._parse_llm_response(response.text)
-            
-            return result
-        except Exception as e:
-            logger.error(f"Error optimizing lineup: {e}")
-            return {'error': str(e), 'changes_needed': False}
-    
-    async def evaluate_waiver_wire(
-        self,
-        available_players: List[Dict[str, Any]],
-        team_data: Dict[str, Any],
-        league_settings: Dict[str, Any],
-        player_research: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Evaluate waiver wire players."""
-        try:
-            prompt = f"""
-You are evaluating waiver wire players for a Fantasy Football team.
-
-⚠️ CRITICAL: You MUST use the league settings below - NEVER make generic recommendations!
 
-CURRENT TEAM:
-{self._format_team_data(team_data)}
-
-LEAGUE SETTINGS (USE THESE EXACT RULES - DO NOT ASSUME STANDARD SETTINGS):
-{self._format_league_settings(league_settings)}
-
-AVAILABLE PLAYERS (Top 20):
-{self._format_available_players(available_players[:20])}
+_WAIVER_SYSTEM = """You are evaluating waiver wire players for a Fantasy Football team.
 
-PLAYER RESEARCH:
-{self._format_player_research(player_research)}
+⚠️ CRITICAL: You MUST use the EXACT rules in the LEAGUE SETTINGS section (DO NOT ASSUME STANDARD SETTINGS) - NEVER make generic recommendations!
 
 Analyze which players, if any, should be picked up. Consider:
-1. **CRITICAL**: Use the EXACT league scoring rules from above:
+1. **CRITICAL**: Use the EXACT league scoring rules provided:
    - If PPR league: Prioritize pass-catching players (high reception counts)
    - If Standard league: Prioritize TD-dependent players
    - Use scoring_settings from league_settings to calculate accurate player values
@@ -150,44 +170,11 @@ Analyze which players, if any, should be picked up. Consider:
 7. How YOUR league's specific scoring rules affect player values
 
 ⚠️ IMPORTANT: In your reasoning, explicitly reference which league rules you're using (e.g., "In this PPR league, Player X is valuable because..." or "Given the SUPERFLEX position...")
-
-Provide recommendations in JSON format:
-{{
-    "should_pickup": true/false,
-    "player_id": "...",
-    "drop_player_id": "...",
-    "reasoning": "...",
-    "priority": "high|medium|low"
-}}
 """
-            
-            response = model.generate_content(prompt)
-            result = self._parse_llm_response(response.text)
-            
-            return result
-        except Exception as e:
-            logger.error(f"Error evaluating waiver wire: {e}")
-            return {'should_pickup': False, 'error': str(e)}
-    
-    async def evaluate_trade(
-        self, 
-        trade: Dict[str, Any],
-        league_settings: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        """Evaluate a trade offer."""
-        try:
-            league_context = ""
-            if league_settings:
-                league_context = f"\nLEAGUE SETTINGS (USE THESE EXACT RULES):\n{self._format_league_settings(league_settings)}\n"
-            
-            prompt = f"""
-You are evaluating a Fantasy Football trade offer.
 
-⚠️ CRITICAL: You MUST use the league settings below - NEVER make generic trade evaluations!
+_TRADE_SYSTEM = """You are evaluating a Fantasy Football trade offer.
 
-TRADE DETAILS:
-{self._format_trade(trade)}
-{league_context}
+⚠️ CRITICAL: You MUST use the EXACT rules in the LEAGUE SETTINGS section (DO NOT ASSUME STANDARD SETTINGS) - NEVER make generic trade evaluations!
 
 Analyze this trade considering:
 1. **CRITICAL**: Player values based on YOUR league's scoring rules:
@@ -200,41 +187,11 @@ Analyze this trade considering:
 4. League context: Use position_eligibility to understand FLEX/SUPERFLEX value
 
 ⚠️ IMPORTANT: In your reasoning, explicitly state which league rules affect the trade (e.g., "In this PPR league, Player X's receptions make them more valuable..." or "Given the SUPERFLEX position, QB Y is worth...")
-
-Provide evaluation in JSON format:
-{{
-    "should_accept": true/false,
-    "reasoning": "...",
-    "value_difference": "favorable|neutral|unfavorable",
-    "confidence": 0.0-1.0
-}}
 """
-            
-            response = model.generate_content(prompt)
-            result = self._parse_llm_response(response.text)
-            
-            return result
-        except Exception as e:
-            logger.error(f"Error evaluating trade: {e}")
-            return {'should_accept': False, 'error': str(e)}
-    
-    async def propose_trades(
-        self,
-        team_data: Dict[str, Any],
-        league_settings: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
-        """Propose beneficial trades."""
-        try:
-            prompt = f"""
-You are proposing Fantasy Football trades.
 
-⚠️ CRITICAL: You MUST use the league settings below - NEVER make generic trade proposals!
+_PROPOSE_SYSTEM = """You are proposing Fantasy Football trades.
 
-CURRENT TEAM:
-{self._format_team_data(team_data)}
-
-LEAGUE SETTINGS (USE THESE EXACT RULES - DO NOT ASSUME STANDARD SETTINGS):
-{self._format_league_settings(league_settings)}
+⚠️ CRITICAL: You MUST use the EXACT rules in the LEAGUE SETTINGS section (DO NOT ASSUME STANDARD SETTINGS) - NEVER make generic trade proposals!
 
 Analyze the team and propose 1-3 trades that would improve the team. Consider:
 1. **CRITICAL**: Team weaknesses based on YOUR league's exact position requirements (check roster_positions):
@@ -251,169 +208,684 @@ Analyze the team and propose 1-3 trades that would improve the team. Consider:
 5. Trade feasibility and fairness (consider YOUR league's scoring when evaluating fairness)
 
 ⚠️ IMPORTANT: In your reasoning, explicitly reference which league rules make the trade beneficial (e.g., "In this PPR league..." or "Given the SUPERFLEX position...")
+"""
 
-Provide proposals in JSON format:
-{{
-    "proposed_trades": [
-        {{
-            "target_team": "...",
-            "players_to_give": ["player_id1", "player_id2"],
-            "players_to_receive": ["player_id3", "player_id4"],
-            "reasoning": "...",
-            "priority": "high|medium|low"
-        }}
-    ]
-}}
+_STRONG_MODEL_NAME = settings.strong_model_name or settings.model_name
+
+# Lineup and proposals need the strong model; trade/waiver scoring starts on
+# the fast model and escalates when it is unsure.
+_lineup_model = genai.GenerativeModel(_STRONG_MODEL_NAME, system_instruction=_LINEUP_SYSTEM)
+_propose_model = genai.GenerativeModel(_STRONG_MODEL_NAME, system_instruction=_PROPOSE_SYSTEM)
+_waiver_model = genai.GenerativeModel(settings.fast_model_name, system_instruction=_WAIVER_SYSTEM)
+_trade_model = genai.GenerativeModel(settings.fast_model_name, system_instruction=_TRADE_SYSTEM)
+_waiver_strong_model = genai.GenerativeModel(_STRONG_MODEL_NAME, system_instruction=_WAIVER_SYSTEM)
+_trade_strong_model = genai.GenerativeModel(_STRONG_MODEL_NAME, system_instruction=_TRADE_SYSTEM)
+
+# Per-request prompt templates, built once at import; the slots take the
+# rendered data sections. The league block changes least, so it leads every
+# template: system instruction + league settings form a stable prefix that
+# Gemini's implicit context caching can reuse across calls.
+_LINEUP_PROMPT = """
+LEAGUE SETTINGS:
+{league}
+
+WEEK: {week}
+
+TEAM DATA:
+{team}
+
+MATCHUP:
+Opponent: {opponent}
+Current Score: {my_score} vs {opponent_score}
+
+PLAYER RESEARCH:
+{research}
 """
-            
-            response = model.generate_content(prompt)
-            result = self._parse_llm_response(response.text)
-            
-            return result.get('proposed_trades', [])
-        except Exception as e:
-            logger.error(f"Error proposing trades: {e}")
-            return []
+
+_WAIVER_PROMPT = """
+LEAGUE SETTINGS:
+{league}
+
+CURRENT TEAM:
+{team}
+
+AVAILABLE PLAYERS (Top 20):
+{available}
+
+PLAYER RESEARCH:
+{research}
+"""
+
+_TRADE_PROMPT = """
+TRADE DETAILS:
+{trade}
+"""
+
+_TRADE_WITH_LEAGUE_PROMPT = """
+LEAGUE SETTINGS:
+{league}
+
+TRADE DETAILS:
+{trade}
+"""
+
+_PROPOSE_PROMPT = """
+LEAGUE SETTINGS:
+{league}
+
+CURRENT TEAM:
+{team}
+"""
+
+# Rate-limited (429) requests are retried with exponential backoff and jitter
+LLM_MAX_RETRIES = 3
+LLM_RETRY_BASE_SECONDS = 1.0
+
+# Fast-model answers below this confidence are re-asked on the strong model
+ESCALATION_CONFIDENCE = 0.6
+
+# Repeated analyses with identical prompts reuse the last answer
+RESPONSE_CACHE_TTL_SECONDS = 300
+RESPONSE_CACHE_MAX_ENTRIES = 128
+
+# Number of waiver-wire candidates shown to the model
+WAIVER_POOL_SIZE = 20
+
+
+@lru_cache(maxsize=8)
+def _scoring_preamble(scoring_type: str) -> str:
+    """Scoring-type line plus its strategy implications for the league prompt."""
+    scoring_lower = scoring_type.lower()
+    # "Half-PPR" also contains "ppr", so the half check must come first
+    if 'half' in scoring_lower or '0.5' in scoring_lower:
+        notes = (
+            "  ⚠️ IMPORTANT: This is a Half-PPR league\n"
+            "  → Pass-catchers get moderate boost (0.5 points per reception)\n"
+            "  → Balance between PPR and Standard strategies\n"
+        )
+    elif 'ppr' in scoring_lower:
+        notes = (
+            "  ⚠️ CRITICAL: This is a PPR (Points Per Reception) league!\n"
+            "  → Pass-catching RBs and WRs are SIGNIFICANTLY more valuable\n"
+            "  → Prioritize players with high reception counts (slot receivers, pass-catching RBs)\n"
+            "  → Example: A RB with 5 catches for 30 yards = 8 points in PPR vs 3 points in Standard\n"
+        )
+    else:
+        notes = (
+            "  → This is Standard scoring (no PPR)\n"
+            "  → TD-dependent players are more valuable\n"
+            "  → Goal-line RBs and red-zone targets are prioritized\n"
+        )
+    return f"Scoring Type: {scoring_type}\n{notes}"
+
+
+@lru_cache(maxsize=32)
+def _position_note(pos_upper: str) -> str:
+    """Extra guidance shown under a starting roster slot, or an empty string."""
+    if pos_upper in SUPERFLEX_POSITIONS:
+        return "    ⚠️ SUPERFLEX allows QB in FLEX - QBs are MUCH more valuable!\n"
+    if pos_upper == 'FLEX':
+        return "    → FLEX typically allows RB/WR/TE - check exact eligibility\n"
+    if pos_upper in IDP_POSITIONS:
+        return "    → IDP league - defensive players are required\n"
+    return ""
+
+
+def _extract_json(text: str, start: int = 0) -> Optional[Tuple[int, int]]:
+    """Find the first balanced ``{...}`` block at or after ``start`` in one pass.
+
+    Braces inside JSON strings are ignored. Returns the (begin, end) slice
+    bounds, or None if no balanced block exists.
+    """
+    depth = 0
+    begin = -1
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            # Quotes only matter inside an object; prose around it is ignored.
+            in_string = depth > 0
+        elif char == '{':
+            if depth == 0:
+                begin = i
+            depth += 1
+        elif char == '}' and depth > 0:
+            depth -= 1
+            if depth == 0:
+                return begin, i + 1
+    return None
+
+
+def _render_team_data(team_data: Dict[str, Any]) -> str:
+    """Format team data for LLM prompt."""
+    parts = [
+        f"Team: {team_data.get('team_name', 'Unknown')}\n",
+        f"Record: {team_data.get('record', {})}\n\n",
+        "Roster:\n",
+    ]
+    parts.extend(
+        f"  - {p.get('name')} ({p.get('position')}) - {p.get('team')} - {p.get('status')}\n"
+        for p in team_data.get('roster', [])
+    )
+    return "".join(parts)
+
+
+def _render_league_settings(settings: Dict[str, Any]) -> str:
+    """Format league settings for LLM prompt with detailed scoring implications."""
+    # Scoring type with implications
+    parts = [_scoring_preamble(settings.get('scoring_type', 'Unknown'))]
+
+    # Roster positions with detailed breakdown
+    roster_positions = settings.get('roster_positions', {})
+    if roster_positions:
+        parts.append("\nRoster Positions (CRITICAL - lineup must match exactly):\n")
+
+        # List starting positions; bench slots are totalled, IR is skipped
+        starting_positions, bench_count = split_roster_positions(roster_positions)
+
+        for pos, count in starting_positions:
+            parts.append(f"  - {pos}: {count}\n")
+            # Add position-specific notes
+            parts.append(_position_note(pos.upper()))
+
+        if bench_count > 0:
+            parts.append(f"  - Bench: {bench_count} spots\n")
+
+    # Custom scoring settings
+    scoring_settings = settings.get('scoring_settings', {})
+    if scoring_settings:
+        parts.append("\nCustom Scoring Rules:\n")
+        for key, value in scoring_settings.items():
+            parts.append(f"  - {key}: {value}\n")
+            # Add implications for common custom rules
+            if 'reception' in key.lower() or 'rec' in key.lower():
+                parts.append("    → This affects pass-catching player values\n")
+            elif 'passing' in key.lower():
+                parts.append("    → This affects QB values\n")
+
+    # Position eligibility (if available)
+    position_eligibility = settings.get('position_eligibility', {})
+    if position_eligibility:
+        parts.append("\nPosition Eligibility Rules:\n")
+        for pos, eligible in position_eligibility.items():
+            parts.append(f"  - {pos} can be filled by: {', '.join(eligible)}\n")
+
+    return "".join(parts)
+
+
+def _format_player_research(research: Dict[str, Any]) -> str:
+    """Format player research for LLM prompt."""
+    return "".join([
+        f"{data.get('name', 'Unknown')}:\n"
+        f"  News: {', '.join(data.get('recent_news', []))}\n"
+        f"  Stats: {data.get('stats', {})}\n"
+        for data in research.values()
+    ])
+
+
+def _projection_rank(player: Dict[str, Any]) -> Tuple[bool, float]:
+    # Players without a projection rank below every projected player
+    projected = player.get('projected_points')
+    return (projected is not None, projected if projected is not None else 0.0)
+
+
+def _top_available(players: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Pick the waiver candidates to show, without sorting the whole pool.
+
+    Ranks by projected_points when any player carries it; players without
+    one follow in pool order. A pool with no projections is assumed to be
+    ranked already.
+    """
+    if len(players) <= WAIVER_POOL_SIZE or all(
+        p.get('projected_points') is None for p in players
+    ):
+        return players[:WAIVER_POOL_SIZE]
+    return heapq.nlargest(WAIVER_POOL_SIZE, players, key=_projection_rank)
+
+
+def _format_available_players(players: List[Dict[str, Any]]) -> str:
+    """Format available players for LLM prompt."""
+    return "".join([
+        f"  - {p.get('name')} ({p.get('position')}) - {p.get('team')}\n"
+        for p in players
+    ])
+
+
+def _format_trade(trade: Dict[str, Any]) -> str:
+    """Format trade details for LLM prompt."""
+    return "".join((
+        f"Trade ID: {trade.get('trade_id')}\n",
+        f"From: {trade.get('from_team')}\n",
+        f"To: {trade.get('to_team')}\n",
+        f"Players Offered: {trade.get('players_offered', [])}\n",
+        f"Players Requested: {trade.get('players_requested', [])}\n",
+    ))
+
+
+class AnalysisTools:
+    """Tools for LLM-based analysis and decision making."""
+
+    __slots__ = (
+        "_llm_semaphore", "_llm_loop", "_response_cache", "_inflight",
+    )
+
+    def __init__(self):
+        # Created per event loop: the shared instance outlives loops started by
+        # asyncio.run or ADK's synchronous Runner.run.
+        self._llm_semaphore: Optional[asyncio.Semaphore] = None
+        self._llm_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._response_cache: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Futures for requests being generated, shared by identical callers
+        self._inflight: Dict[bytes, "asyncio.Future[Dict[str, Any]]"] = {}
     
-    def _format_team_data(self, team_data: Dict[str, Any]) -> str:
-        """Format team data for LLM prompt."""
-        roster = team_data.get('roster', [])
-        formatted = f"Team: {team_data.get('team_name', 'Unknown')}\n"
-        formatted += f"Record: {team_data.get('record', {})}\n\n"
-        formatted += "Roster:\n"
-        for player in roster:
-            formatted += f"  - {player.get('name')} ({player.get('position')}) - {player.get('team')} - {player.get('status')}\n"
-        return formatted
+    def get_tools(self) -> List[FunctionTool]:
+        """Get all analysis tools."""
+        return [
+            FunctionTool(func=self.run_analyses),
+            FunctionTool(func=self.run_all),
+            FunctionTool(func=self.optimize_lineup),
+            FunctionTool(func=self.evaluate_waiver_wire),
+            FunctionTool(func=self.evaluate_trade),
+            FunctionTool(func=self.propose_trades),
+        ]
+
+    async def run_analyses(self, jobs: List[Dict[str, Any]]) -> List[Any]:
+        """Run several analyses concurrently in a single tool call.
+
+        Prefer this over calling the individual analysis tools one by one when
+        more than one analysis is needed in the same step.
+
+        Args:
+            jobs: List of analyses to run, each with:
+                - analysis: 'optimize_lineup', 'evaluate_waiver_wire',
+                  'evaluate_trade', or 'propose_trades'
+                - args: Keyword arguments for that analysis
+
+        Returns:
+            One result per job, in the same order as jobs.
+        """
+        handlers = {
+            'optimize_lineup': self.optimize_lineup,
+            'evaluate_waiver_wire': self.evaluate_waiver_wire,
+            'evaluate_trade': self.evaluate_trade,
+            'propose_trades': self.propose_trades,
+        }
+
+        async def run_job(job: Any) -> Any:
+            if not isinstance(job, dict):
+                return {'error': f"Each job must be an object, got {type(job).__name__}"}
+            handler = handlers.get(job.get('analysis'))
+            if handler is None:
+                return {'error': f"Unknown analysis: {job.get('analysis')}"}
+            args = job.get('args', {})
+            if not isinstance(args, dict):
+                return {'error': f"args for {job.get('analysis')} must be an object"}
+            try:
+                return await handler(**args)
+            except TypeError as e:
+                return {'error': f"Invalid arguments for {job.get('analysis')}: {e}"}
+
+        return list(await asyncio.gather(*(run_job(job) for job in jobs)))
+
+    async def run_all(
+        self,
+        team_data: Dict[str, Any],
+        league_settings: Dict[str, Any],
+        matchup: Dict[str, Any],
+        player_research: Dict[str, Any],
+        available_players: List[Dict[str, Any]],
+        week: int
+    ) -> Dict[str, Any]:
+        """Run the weekly lineup, waiver and trade-proposal analyses together.
+
+        Use this for a full weekly review instead of calling optimize_lineup,
+        evaluate_waiver_wire and propose_trades separately.
+
+        Returns:
+            Dict with 'lineup', 'waivers' and 'proposed_trades' results.
+        """
+        lineup, waivers, proposed_trades = await asyncio.gather(
+            self.optimize_lineup(team_data, league_settings, matchup, player_research, week),
+            self.evaluate_waiver_wire(available_players, team_data, league_settings, player_research),
+            self.propose_trades(team_data, league_settings),
+        )
+        return {'lineup': lineup, 'waivers': waivers, 'proposed_trades': proposed_trades}
     
-    def _format_league_settings(self, settings: Dict[str, Any]) -> str:
-        """Format league settings for LLM prompt with detailed scoring implications."""
-        formatted = ""
-        
-        # Scoring type with implications
-        scoring_type = settings.get('scoring_type', 'Unknown')
-        formatted += f"Scoring Type: {scoring_type}\n"
-        
-        # Add scoring implications
-        scoring_lower = scoring_type.lower()
-        if 'ppr' in scoring_lower:
-            formatted += "  ⚠️ CRITICAL: This is a PPR (Points Per Reception) league!\n"
-            formatted += "  → Pass-catching RBs and WRs are SIGNIFICANTLY more valuable\n"
-            formatted += "  → Prioritize players with high reception counts (slot receivers, pass-catching RBs)\n"
-            formatted += "  → Example: A RB with 5 catches for 30 yards = 8 points in PPR vs 3 points in Standard\n"
-        elif 'half' in scoring_lower or '0.5' in scoring_lower:
-            formatted += "  ⚠️ IMPORTANT: This is a Half-PPR league\n"
-            formatted += "  → Pass-catchers get moderate boost (0.5 points per reception)\n"
-            formatted += "  → Balance between PPR and Standard strategies\n"
-        else:
-            formatted += "  → This is Standard scoring (no PPR)\n"
-            formatted += "  → TD-dependent players are more valuable\n"
-            formatted += "  → Goal-line RBs and red-zone targets are prioritized\n"
-        
-        # Roster positions with detailed breakdown
-        roster_positions = settings.get('roster_positions', {})
-        if roster_positions:
-            formatted += "\nRoster Positions (CRITICAL - lineup must match exactly):\n"
-            
-            # Handle different formats
-            if isinstance(roster_positions, dict):
-                position_dict = roster_positions
-            elif isinstance(roster_positions, list):
-                # Convert list to dict
-                position_dict = {}
-                for pos in roster_positions:
-                    if isinstance(pos, dict):
-                        pos_name = pos.get('position', pos.get('type', 'Unknown'))
-                        count = pos.get('count', 1)
-                    else:
-                        pos_name = str(pos)
-                        count = 1
-                    position_dict[pos_name] = position_dict.get(pos_name, 0) + count
-            else:
-                position_dict = {}
-            
-            # Separate starting positions from bench
-            starting_positions = []
-            bench_count = 0
-            
-            for pos, count in sorted(position_dict.items()):
-                if pos.upper() in ['BN', 'BE', 'BENCH']:
-                    bench_count += count
-                elif pos.upper() not in ['IR', 'INJURED']:
-                    starting_positions.append((pos, count))
-            
-            # Format starting positions
-            for pos, count in starting_positions:
-                formatted += f"  - {pos}: {count}\n"
-                
-                # Add position-specific notes
-                if pos.upper() in ['SUPERFLEX', 'OP', 'OFFENSIVE PLAYER']:
-                    formatted += "    ⚠️ SUPERFLEX allows QB in FLEX - QBs are MUCH more valuable!\n"
-                elif pos.upper() == 'FLEX':
-                    formatted += "    → FLEX typically allows RB/WR/TE - check exact eligibility\n"
-                elif pos.upper() in ['IDP', 'IDP_FLEX']:
-                    formatted += "    → IDP league - defensive players are required\n"
-            
-            if bench_count > 0:
-                formatted += f"  - Bench: {bench_count} spots\n"
-        
-        # Custom scoring settings
-        scoring_settings = settings.get('scoring_settings', {})
-        if scoring_settings:
-            formatted += "\nCustom Scoring Rules:\n"
-            for key, value in scoring_settings.items():
-                formatted += f"  - {key}: {value}\n"
-                # Add implications for common custom rules
-                if 'reception' in key.lower() or 'rec' in key.lower():
-                    formatted += "    → This affects pass-catching player values\n"
-                elif 'passing' in key.lower():
-                    formatted += "    → This affects QB values\n"
-        
-        # Position eligibility (if available)
-        position_eligibility = settings.get('position_eligibility', {})
-        if position_eligibility:
-            formatted += "\nPosition Eligibility Rules:\n"
-            for pos, eligible in position_eligibility.items():
-                formatted += f"  - {pos} can be filled by: {', '.join(eligible)}\n"
-        
-        return formatted
+    async def optimize_lineup(
+        self,
+        team_data: Dict[str, Any],
+        league_settings: Dict[str, Any],
+        matchup: Dict[str, Any],
+        player_research: Dict[str, Any],
+        week: int
+    ) -> Dict[str, Any]:
+        """Optimize lineup using LLM analysis."""
+        try:
+            prompt = self._build_lineup_prompt(
+                team_data, league_settings, matchup, player_research, week
+            )
+            return await self._generate_cached(_lineup_model, prompt, _LINEUP_CONFIG)
+        except Exception as e:
+            logger.error(f"Error optimizing lineup: {e}")
+            return {'error': str(e), 'changes_needed': False}
+
+    async def stream_lineup_changes(
+        self,
+        team_data: Dict[str, Any],
+        league_settings: Dict[str, Any],
+        matchup: Dict[str, Any],
+        player_research: Dict[str, Any],
+        week: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield each recommended lineup change as soon as it has streamed in.
+
+        For callers that can act on changes incrementally; optimize_lineup
+        still returns the complete decision in one dict. Errors from the
+        request are raised to the caller rather than ending the stream early.
+        """
+        prompt = self._build_lineup_prompt(
+            team_data, league_settings, matchup, player_research, week
+        )
+        pending: List[str] = []
+        cursor: Optional[int] = None
+        chunks = self._generate_stream(_lineup_model, prompt, _LINEUP_CONFIG)
+        try:
+            async for text in chunks:
+                pending.append(text)
+                buffer = "".join(pending)
+                if cursor is None:
+                    key = buffer.find('"recommended_changes"')
+                    bracket = buffer.find('[', key) if key != -1 else -1
+                    if bracket == -1:
+                        continue
+                    cursor = bracket + 1
+                while True:
+                    while cursor < len(buffer) and buffer[cursor] in ' \t\r\n,':
+                        cursor += 1
+                    if cursor < len(buffer) and buffer[cursor] == ']':
+                        return
+                    span = _extract_json(buffer, cursor)
+                    if span is None:
+                        break
+                    begin, cursor = span
+                    yield _json_loads(buffer[begin:cursor])
+                # Keep only the unread tail, so each join stays short
+                pending = [buffer[cursor:]]
+                cursor = 0
+        finally:
+            await chunks.aclose()
+
+    def _build_lineup_prompt(
+        self,
+        team_data: Dict[str, Any],
+        league_settings: Dict[str, Any],
+        matchup: Dict[str, Any],
+        player_research: Dict[str, Any],
+        week: int
+    ) -> str:
+        """Build the lineup optimization prompt."""
+        return _LINEUP_PROMPT.format(
+            week=week,
+            team=_render_team_data(team_data),
+            league=_render_league_settings(league_settings),
+            opponent=matchup.get('opponent', 'TBD'),
+            my_score=matchup.get('my_score', 0),
+            opponent_score=matchup.get('opponent_score', 0),
+            research=_format_player_research(player_research),
+        )
     
-    def _format_player_research(self, research: Dict[str, Any]) -> str:
-        """Format player research for LLM prompt."""
-        formatted = ""
-        for player_id, data in research.items():
-            formatted += f"{data.get('name', 'Unknown')}:\n"
-            formatted += f"  News: {', '.join(data.get('recent_news', []))}\n"
-            formatted += f"  Stats: {data.get('stats', {})}\n"
-        return formatted
+    async def evaluate_waiver_wire(
+        self,
+        available_players: List[Dict[str, Any]],
+        team_data: Dict[str, Any],
+        league_settings: Dict[str, Any],
+        player_research: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Evaluate waiver wire players."""
+        try:
+            prompt = self._build_waiver_prompt(
+                available_players, team_data, league_settings, player_research
+            )
+            return await self._generate_cached(
+                _waiver_model, prompt, _WAIVER_CONFIG, escalate_to=_waiver_strong_model
+            )
+        except Exception as e:
+            logger.error(f"Error evaluating waiver wire: {e}")
+            return {'should_pickup': False, 'error': str(e)}
+
+    def _build_waiver_prompt(
+        self,
+        available_players: List[Dict[str, Any]],
+        team_data: Dict[str, Any],
+        league_settings: Dict[str, Any],
+        player_research: Dict[str, Any]
+    ) -> str:
+        """Build the waiver wire evaluation prompt."""
+        return _WAIVER_PROMPT.format(
+            team=_render_team_data(team_data),
+            league=_render_league_settings(league_settings),
+            available=_format_available_players(_top_available(available_players)),
+            research=_format_player_research(player_research),
+        )
     
-    def _format_available_players(self, players: List[Dict[str, Any]]) -> str:
-        """Format available players for LLM prompt."""
-        formatted = ""
-        for player in players:
-            formatted += f"  - {player.get('name')} ({player.get('position')}) - {player.get('team')}\n"
-        return formatted
+    async def evaluate_trade(
+        self, 
+        trade: Dict[str, Any],
+        league_settings: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Evaluate a trade offer."""
+        try:
+            prompt = self._build_trade_prompt(trade, league_settings)
+            return await self._generate_cached(
+                _trade_model, prompt, _TRADE_CONFIG, escalate_to=_trade_strong_model
+            )
+        except Exception as e:
+            logger.error(f"Error evaluating trade: {e}")
+            return {'should_accept': False, 'error': str(e)}
+
+    def _build_trade_prompt(
+        self,
+        trade: Dict[str, Any],
+        league_settings: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Build the trade evaluation prompt."""
+        if not league_settings:
+            return _TRADE_PROMPT.format(trade=_format_trade(trade))
+        return _TRADE_WITH_LEAGUE_PROMPT.format(
+            trade=_format_trade(trade),
+            league=_render_league_settings(league_settings),
+        )
     
-    def _format_trade(self, trade: Dict[str, Any]) -> str:
-        """Format trade details for LLM prompt."""
-        formatted = f"Trade ID: {trade.get('trade_id')}\n"
-        formatted += f"From: {trade.get('from_team')}\n"
-        formatted += f"To: {trade.get('to_team')}\n"
-        formatted += f"Players Offered: {trade.get('players_offered', [])}\n"
-        formatted += f"Players Requested: {trade.get('players_requested', [])}\n"
-        return formatted
+    async def propose_trades(
+        self,
+        team_data: Dict[str, Any],
+        league_settings: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Propose beneficial trades."""
+        try:
+            prompt = self._build_propose_prompt(team_data, league_settings)
+            result = await self._generate_cached(_propose_model, prompt, _PROPOSE_CONFIG)
+            return result.get('proposed_trades', [])
+        except Exception as e:
+            logger.error(f"Error proposing trades: {e}")
+            return []
+
+    def _build_propose_prompt(
+        self,
+        team_data: Dict[str, Any],
+        league_settings: Dict[str, Any]
+    ) -> str:
+        """Build the trade proposal prompt."""
+        return _PROPOSE_PROMPT.format(
+            team=_render_team_data(team_data),
+            league=_render_league_settings(league_settings),
+        )
+
+    def _llm_slot(self) -> asyncio.Semaphore:
+        """Semaphore bounding in-flight Gemini requests to settings.max_concurrent_llm."""
+        _configure()
+        loop = asyncio.get_running_loop()
+        if self._llm_semaphore is None or self._llm_loop is not loop:
+            self._llm_semaphore = asyncio.Semaphore(settings.max_concurrent_llm)
+            self._llm_loop = loop
+        return self._llm_semaphore
+
+    async def _request(
+        self,
+        gen_model: genai.GenerativeModel,
+        prompt: str,
+        generation_config: Optional[genai.types.GenerationConfig],
+        stream: bool = False
+    ) -> Any:
+        """Call generate_content_async, backing off and retrying on rate limits.
+
+        Runs inside the caller's concurrency slot, so retries never add load
+        beyond settings.max_concurrent_llm.
+        """
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                return await gen_model.generate_content_async(
+                    prompt, generation_config=generation_config, stream=stream
+                )
+            except google_exceptions.TooManyRequests:
+                if attempt == LLM_MAX_RETRIES:
+                    raise
+                delay = LLM_RETRY_BASE_SECONDS * 2 ** attempt
+                delay += random.uniform(0, LLM_RETRY_BASE_SECONDS)
+                logger.warning(f"Gemini rate limit hit; retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _generate(
+        self,
+        gen_model: genai.GenerativeModel,
+        prompt: str,
+        generation_config: Optional[genai.types.GenerationConfig] = None
+    ) -> str:
+        """Send a prompt to one of the tool models and return the response text.
+
+        Uses the SDK's async client so concurrent analyses overlap their
+        round-trips, capped at settings.max_concurrent_llm in-flight requests.
+        """
+        async with self._llm_slot():
+            response = await self._request(gen_model, prompt, generation_config)
+        return response.text
+
+    async def _generate_stream(
+        self,
+        gen_model: genai.GenerativeModel,
+        prompt: str,
+        generation_config: Optional[genai.types.GenerationConfig] = None
+    ) -> AsyncIterator[str]:
+        """Yield response text from one of the tool models as chunks arrive."""
+        async with self._llm_slot():
+            response = await self._request(gen_model, prompt, generation_config, stream=True)
+            try:
+                async for chunk in response:
+                    yield chunk.text
+            finally:
+                # A caller that stops early leaves the SDK stream open; read it
+                # to the end so the request completes before the slot is freed
+                await response.resolve()
+
+    async def _generate_cached(
+        self,
+        gen_model: genai.GenerativeModel,
+        prompt: str,
+        generation_config: genai.types.GenerationConfig,
+        escalate_to: Optional[genai.GenerativeModel] = None
+    ) -> Dict[str, Any]:
+        """Generate and parse a response, reusing recent answers for identical prompts.
+
+        Concurrent calls with the same prompt share a single in-flight request.
+        If ``escalate_to`` is given, answers that fail validation or fall below
+        ESCALATION_CONFIDENCE are regenerated with that model.
+        """
+        schema = generation_config.response_schema
+        key = hashlib.blake2b(f"{schema.__name__}:{prompt}".encode(), digest_size=16).digest()
+        while True:
+            cached = self._response_cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < RESPONSE_CACHE_TTL_SECONDS:
+                self._response_cache.move_to_end(key)
+                return dict(cached[1])
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            try:
+                return dict(await asyncio.shield(pending))
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The caller generating this answer was cancelled; take over
+
+        pending = asyncio.get_running_loop().create_future()
+        self._inflight[key] = pending
+        try:
+            result = self._parse_structured(
+                await self._generate(gen_model, prompt, generation_config), schema
+            )
+            if escalate_to is not None and self._needs_escalation(result):
+                result = self._parse_structured(
+                    await self._generate(escalate_to, prompt, generation_config), schema
+                )
+            if 'error' not in result:
+                self._response_cache[key] = (time.monotonic(), result)
+                self._response_cache.move_to_end(key)
+                while len(self._response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+                    self._response_cache.popitem(last=False)
+            pending.set_result(result)
+            return dict(result)
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as e:
+            pending.set_exception(e)
+            # Mark it retrieved so a future nobody awaited is not logged
+            pending.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _needs_escalation(result: Dict[str, Any]) -> bool:
+        """Whether a fast-model answer should be re-asked on the strong model."""
+        if 'error' in result:
+            return True
+        try:
+            return float(result.get('confidence', 0.0)) < ESCALATION_CONFIDENCE
+        except (TypeError, ValueError):
+            return True
     
-    def _parse_llm_response(self, response_text: str) -> Dict[str, Any]:
-        """Parse LLM response, attempting to extract JSON."""
-        import json
-        import re
-        
-        # Try to extract JSON from response
-        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-        if json_match:
+    def _parse_structured(self, response_text: str, schema: type) -> Dict[str, Any]:
+        """Validate a structured-output response against its pydantic schema.
+
+        A response wrapped in prose or ```json fences is decoded from its first
+        ``{``. Returns an error dict naming the schema if nothing matches.
+        """
+        try:
+            return schema.model_validate_json(response_text).model_dump()
+        except ValidationError as e:
+            error: ValueError = e
+
+        start = response_text.find('{')
+        if start >= 0:
             try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError:
-                pass
-        
-        # If JSON parsing fails, return the raw response
-        return {'raw_response': response_text}
+                obj, _ = _DECODER.raw_decode(response_text, start)
+                return schema.model_validate(obj).model_dump()
+            except ValueError as e:  # JSONDecodeError and ValidationError
+                error = e
+
+        logger.warning(f"Response did not match {schema.__name__}: {error}")
+        return {'error': f"Response did not match {schema.__name__}", 'schema': schema.__name__}
+
 
+# Shared instance; its caches and concurrency limit are process-wide
+default_analysis_tools = AnalysisTools()
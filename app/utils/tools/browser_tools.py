@@ -48,9 +48,38 @@ class BrowserAutomationTools:
         This class provides a wrapper/adapter layer for agent compatibility.
         """
         self.mcp_server_available = True
+        self._league_url = f"https://football.fantasysports.yahoo.com/f1/{settings.yahoo_league_id}"
+        self._roster_url = f"{self._league_url}/team/roster"
+        self._players_url = f"{self._league_url}/players"
+        self._trades_url = f"{self._league_url}/transactions/trade"
+        # Tool wrappers are built once; ADK may ask for them every turn
+        self._tools = [
+            FunctionTool(func=self.set_lineup),
+            FunctionTool(func=self.add_player),
+            FunctionTool(func=self.drop_player),
+            FunctionTool(func=self.propose_trade),
+            FunctionTool(func=self.accept_trade),
+            FunctionTool(func=self.reject_trade),
+            FunctionTool(func=self.navigate_to_yahoo_fantasy),
+            FunctionTool(func=self.take_screenshot),
+        ]
+        self._debug_output = settings.debug_browser_tool_output
         logger.info("Browser automation tools initialized (using Browser MCP)")
         logger.info("Make sure Browser MCP Chrome extension is installed: https://browsermcp.io/")
     
+    def _result(self, note: str, **fields: Any) -> Dict[str, Any]:
+        """Build a successful tool result.
+        
+        Results are fed back to the model on every turn, so the human-oriented
+        note is only included when debug_browser_tool_output is enabled. The
+        MCP tool hints in fields are always kept; they tell the model which
+        Browser MCP tools to call next.
+        """
+        result = {'success': True, **fields}
+        if self._debug_output:
+            result['note'] = note
+        return result
+    
     def get_tools(self) -> List[FunctionTool]:
         """Get all browser automation tools.
 
@@ -70,16 +99,7 @@ class BrowserAutomationTools:
         - mcp_browsermcp_browser_wait: Wait
         - mcp_browsermcp_browser_get_console_logs: Get console logs
         """
-        return [
-            FunctionTool(func=self.set_lineup),
-            FunctionTool(func=self.add_player),
-            FunctionTool(func=self.drop_player),
-            FunctionTool(func=self.propose_trade),
-            FunctionTool(func=self.accept_trade),
-            FunctionTool(func=self.reject_trade),
-            FunctionTool(func=self.navigate_to_yahoo_fantasy),
-            FunctionTool(func=self.take_screenshot),
-        ]
+        return self._tools
     
     async def navigate_to_yahoo_fantasy(self, url: Optional[str] = None) -> Dict[str, Any]:
         """Navigate to Yahoo Fantasy Football using Browser MCP.
@@ -92,20 +112,19 @@ class BrowserAutomationTools:
         """
         try:
             if url is None:
-                url = f"https://football.fantasysports.yahoo.com/f1/{settings.yahoo_league_id}"
+                url = self._league_url
             
-            logger.info(f"Navigating to {url} using Browser MCP")
+            logger.info("Navigating to %s using Browser MCP", url)
             
             # In actual implementation, this would call the MCP server's navigate tool
             # The agent will use Browser MCP tools directly via MCP
-            return {
-                'success': True,
-                'url': url,
-                'note': 'Browser MCP will navigate using your existing browser profile',
-                'mcp_tool': 'mcp_browsermcp_browser_navigate'
-            }
+            return self._result(
+                'Browser MCP will navigate using your existing browser profile',
+                mcp_tool='mcp_browsermcp_browser_navigate',
+                url=url
+            )
         except Exception as e:
-            logger.error(f"Navigation failed: {e}")
+            logger.error("Navigation failed: %s", e)
             return {'success': False, 'error': str(e)}
     
     async def set_lineup(self, changes: List[Dict[str, Any]], week: Optional[int] = None) -> Dict[str, Any]:
@@ -125,14 +144,13 @@ class BrowserAutomationTools:
             week: Week number (None for current week)
         """
         try:
-            logger.info(f"Setting lineup with {len(changes)} changes using Browser MCP")
+            logger.info("Setting lineup with %d changes using Browser MCP", len(changes))
             
             # Navigate to lineup page
-            league_url = f"https://football.fantasysports.yahoo.com/f1/{settings.yahoo_league_id}"
             if week:
-                lineup_url = f"{league_url}/team/roster?week={week}"
+                lineup_url = f"{self._roster_url}?week={week}"
             else:
-                lineup_url = f"{league_url}/team/roster"
+                lineup_url = self._roster_url
             
             # Browser MCP workflow:
             # 1. Navigate to lineup page (mcp_browsermcp_browser_navigate)
@@ -142,20 +160,19 @@ class BrowserAutomationTools:
             #    - Click/drag to position (mcp_browsermcp_browser_click or drag_and_drop)
             # 4. Click save button (mcp_browsermcp_browser_click)
             
-            return {
-                'success': True,
-                'changes_applied': len(changes),
-                'note': 'Browser MCP will execute these changes using your browser',
-                'mcp_tools_used': [
+            return self._result(
+                'Browser MCP will execute these changes using your browser',
+                mcp_tools_used=[
                     'mcp_browsermcp_browser_navigate',
                     'mcp_browsermcp_browser_snapshot',
                     'mcp_browsermcp_browser_click',
                     'mcp_browsermcp_browser_drag_and_drop'
                 ],
-                'url': lineup_url
-            }
+                changes_applied=len(changes),
+                url=lineup_url
+            )
         except Exception as e:
-            logger.error(f"Error setting lineup: {e}")
+            logger.error("Error setting lineup: %s", e)
             return {'success': False, 'error': str(e)}
     
     async def add_player(self, player_id: str, drop_player_id: Optional[str] = None) -> Dict[str, Any]:
@@ -169,48 +186,42 @@ class BrowserAutomationTools:
         5. Confirm transaction
         """
         try:
-            logger.info(f"Adding player {player_id} using Browser MCP")
-            if drop_player_id:
-                logger.info(f"Dropping player {drop_player_id}")
+            logger.info(
+                "Adding player %s (dropping %s) using Browser MCP",
+                player_id,
+                drop_player_id or "nobody",
+            )
             
-            league_url = f"https://football.fantasysports.yahoo.com/f1/{settings.yahoo_league_id}"
-            players_url = f"{league_url}/players"
-            
-            return {
-                'success': True,
-                'note': 'Browser MCP will execute this transaction using your browser',
-                'mcp_tools_used': [
+            return self._result(
+                'Browser MCP will execute this transaction using your browser',
+                mcp_tools_used=[
                     'mcp_browsermcp_browser_navigate',
                     'mcp_browsermcp_browser_snapshot',
                     'mcp_browsermcp_browser_click',
                     'mcp_browsermcp_browser_type'
                 ],
-                'url': players_url
-            }
+                url=self._players_url
+            )
         except Exception as e:
-            logger.error(f"Error adding player: {e}")
+            logger.error("Error adding player: %s", e)
             return {'success': False, 'error': str(e)}
     
     async def drop_player(self, player_id: str) -> Dict[str, Any]:
         """Drop a player from the team using Browser MCP."""
         try:
-            logger.info(f"Dropping player {player_id} using Browser MCP")
-            
-            league_url = f"https://football.fantasysports.yahoo.com/f1/{settings.yahoo_league_id}"
-            roster_url = f"{league_url}/team/roster"
+            logger.info("Dropping player %s using Browser MCP", player_id)
             
-            return {
-                'success': True,
-                'note': 'Browser MCP will execute this drop using your browser',
-                'mcp_tools_used': [
+            return self._result(
+                'Browser MCP will execute this drop using your browser',
+                mcp_tools_used=[
                     'mcp_browsermcp_browser_navigate',
                     'mcp_browsermcp_browser_snapshot',
                     'mcp_browsermcp_browser_click'
                 ],
-                'url': roster_url
-            }
+                url=self._roster_url
+            )
         except Exception as e:
-            logger.error(f"Error dropping player: {e}")
+            logger.error("Error dropping player: %s", e)
             return {'success': False, 'error': str(e)}
     
     async def propose_trade(self, trade_details: Dict[str, Any]) -> Dict[str, Any]:
@@ -218,58 +229,52 @@ class BrowserAutomationTools:
         try:
             logger.info("Proposing trade using Browser MCP")
             
-            league_url = f"https://football.fantasysports.yahoo.com/f1/{settings.yahoo_league_id}"
-            trades_url = f"{league_url}/transactions/trade"
-            
-            return {
-                'success': True,
-                'note': 'Browser MCP will execute this trade proposal using your browser',
-                'mcp_tools_used': [
+            return self._result(
+                'Browser MCP will execute this trade proposal using your browser',
+                mcp_tools_used=[
                     'mcp_browsermcp_browser_navigate',
                     'mcp_browsermcp_browser_snapshot',
                     'mcp_browsermcp_browser_click',
                     'mcp_browsermcp_browser_type'
                 ],
-                'url': trades_url
-            }
+                url=self._trades_url
+            )
         except Exception as e:
-            logger.error(f"Error proposing trade: {e}")
+            logger.error("Error proposing trade: %s", e)
             return {'success': False, 'error': str(e)}
     
     async def accept_trade(self, trade_id: str) -> Dict[str, Any]:
         """Accept a pending trade offer using Browser MCP."""
         try:
-            logger.info(f"Accepting trade {trade_id} using Browser MCP")
+            logger.info("Accepting trade %s using Browser MCP", trade_id)
             
-            return {
-                'success': True,
-                'note': 'Browser MCP will execute this trade acceptance using your browser',
-                'mcp_tools_used': [
+            return self._result(
+                'Browser MCP will execute this trade acceptance using your browser',
+                mcp_tools_used=[
                     'mcp_browsermcp_browser_navigate',
                     'mcp_browsermcp_browser_snapshot',
                     'mcp_browsermcp_browser_click'
                 ]
-            }
+            )
         except Exception as e:
-            logger.error(f"Error accepting trade: {e}")
+            logger.error("Error accepting trade: %s", e)
             return {'success': False, 'error': str(e)}
     
     async def reject_trade(self, trade_id: str) -> Dict[str, Any]:
         """Reject a pending trade offer using Browser MCP."""
         try:
-            logger.info(f"Rejecting trade {trade_id} using Browser MCP")
+            logger.info("Rejecting trade %s using Browser MCP", trade_id)
             
-            return {
-                'success': True,
-                'note': 'Browser MCP will execute this trade rejection using your browser',
-                'mcp_tools_used': [
+            return self._result(
+                'Browser MCP will execute this trade rejection using your browser',
+                mcp_tools_used=[
                     'mcp_browsermcp_browser_navigate',
                     'mcp_browsermcp_browser_snapshot',
                     'mcp_browsermcp_browser_click'
                 ]
-            }
+            )
         except Exception as e:
-            logger.error(f"Error rejecting trade: {e}")
+            logger.error("Error rejecting trade: %s", e)
             return {'success': False, 'error': str(e)}
     
     async def take_screenshot(self, filename: Optional[str] = None) -> Dict[str, Any]:
@@ -281,13 +286,12 @@ class BrowserAutomationTools:
         try:
             logger.info("Taking screenshot using Browser MCP")
             
-            return {
-                'success': True,
-                'note': 'Browser MCP will capture a screenshot',
-                'mcp_tool': 'mcp_browsermcp_browser_screenshot',
-                'filename': filename
-            }
+            return self._result(
+                'Browser MCP will capture a screenshot',
+                mcp_tool='mcp_browsermcp_browser_screenshot',
+                filename=filename
+            )
         except Exception as e:
-            logger.error(f"Error taking screenshot: {e}")
+            logger.error("Error taking screenshot: %s", e)
             return {'success': False, 'error': str(e)}
 
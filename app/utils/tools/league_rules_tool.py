@@ -3,11 +3,20 @@ import logging
 from typing import Dict, Any, Optional
 from google.adk.tools import FunctionTool
 
+from app.utils.config import settings
 from app.utils.league_memory import LeagueRulesMemory
 
 logger = logging.getLogger(__name__)
 
 
+def _public_rules(rules: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop bookkeeping keys (_precomputed, raw_extra) before rules go back to the model."""
+    return {
+        key: value for key, value in rules.items()
+        if not key.startswith('_') and key != 'raw_extra'
+    }
+
+
 class LeagueRulesTool:
     """Tool for discovering, storing, and retrieving league-specific rules.
     
@@ -61,8 +70,6 @@ class LeagueRulesTool:
             If league_info is not provided, returns instructions to fetch it first.
             The agent should call yahoo_ff_get_league_info first, then pass results here.
         """
-        from app.utils.config import settings
-        
         # Determine league_id
         if league_info and 'league_id' in league_info:
             league_id = league_id or league_info['league_id']
@@ -85,7 +92,7 @@ class LeagueRulesTool:
                     'source': 'discovered_and_stored',
                     'league_id': league_id,
                     'message': f'Successfully discovered and stored league rules for league {league_id}',
-                    'rules': stored_rules,
+                    'rules': _public_rules(stored_rules),
                     'scoring_type': stored_rules.get('scoring_type', 'Unknown'),
                     'note': 'Rules are now stored in memory and will be remembered for future use.'
                 }
@@ -104,7 +111,7 @@ class LeagueRulesTool:
                 'source': 'stored',
                 'league_id': league_id,
                 'message': f'Using stored league rules for league {league_id}',
-                'rules': stored_rules,
+                'rules': _public_rules(stored_rules),
                 'scoring_type': stored_rules.get('scoring_type', 'Unknown'),
                 'note': 'Rules were previously discovered and stored. Use force_refresh=True to fetch fresh rules.'
             }
@@ -166,8 +173,6 @@ class LeagueRulesTool:
         Returns:
             Stored league rules if available, or instructions to discover them
         """
-        from app.utils.config import settings
-        
         league_id = league_id or settings.yahoo_league_id
         
         if not league_id:
@@ -182,7 +187,7 @@ class LeagueRulesTool:
             return {
                 'status': 'success',
                 'league_id': league_id,
-                'rules': rules,
+                'rules': _public_rules(rules),
                 'formatted': self.memory.format_rules_for_agent(league_id)
             }
         else:
@@ -202,8 +207,6 @@ class LeagueRulesTool:
         Returns:
             Status indicating whether rules are known
         """
-        from app.utils.config import settings
-        
         league_id = league_id or settings.yahoo_league_id
         
         if not league_id:
@@ -251,6 +254,6 @@ class LeagueRulesTool:
         return {
             'status': 'success',
             'query': query,
-            'matches': results
+            'matches': [_public_rules(rules) for rules in results]
         }
 
@@ -18,6 +18,7 @@ The MCP server provides comprehensive tools including:
 These tools are available via the MCP server configured in mcp_config.json.
 This module provides a wrapper/adapter layer for compatibility with the agent.
 """
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional
 from google.adk.tools import FunctionTool
@@ -52,6 +53,7 @@ class YahooFantasyTools:
         it will use the MCP server tools directly.
         """
         return [
+            FunctionTool(func=self.get_weekly_snapshot),
             FunctionTool(func=self.get_team_data),
             FunctionTool(func=self.get_league_settings),
             FunctionTool(func=self.get_matchup),
@@ -63,6 +65,43 @@ class YahooFantasyTools:
             FunctionTool(func=self.build_optimal_lineup),
         ]
     
+    async def get_weekly_snapshot(self, week: Optional[int] = None) -> Dict[str, Any]:
+        """Get everything weekly management needs in one call.
+        
+        Fetches team data, league settings, matchup, standings, pending trades
+        and available players concurrently, so the round trips overlap instead
+        of adding up.
+        
+        Args:
+            week: Week number (None for current week)
+        """
+        if week is None:
+            week = await self.get_current_week()
+        (
+            team_data,
+            league_settings,
+            matchup,
+            standings,
+            pending_trades,
+            available_players,
+        ) = await asyncio.gather(
+            self.get_team_data(),
+            self.get_league_settings(),
+            self.get_matchup(week),
+            self.get_league_standings(),
+            self.get_pending_trades(),
+            self.get_available_players(),
+        )
+        return {
+            'week': week,
+            'team_data': team_data,
+            'league_settings': league_settings,
+            'matchup': matchup,
+            'standings': standings,
+            'pending_trades': pending_trades,
+            'available_players': available_players,
+        }
+    
     async def get_team_data(self) -> Dict[str, Any]:
         """Get current team data via MCP server.
         
@@ -1,4 +1,5 @@
 """Example usage of the Fantasy Football Agent."""
+import argparse
 import asyncio
 import logging
 from app.agent import agent
@@ -48,29 +49,41 @@ async def example_get_team_data():
     return result
 
 
-async def main():
-    """Run example functions."""
+async def _run_limited(example, semaphore):
+    async with semaphore:
+        return await example()
+
+
+async def main(max_concurrency: int = 3):
+    """Run example functions.
+    
+    The selected examples are independent, so they run concurrently with at
+    most max_concurrency in flight.
+    """
     print("=" * 60)
     print("Fantasy Football Agent - Example Usage")
     print("=" * 60)
     print()
     
     # Uncomment the examples you want to run:
+    examples = [
+        # example_get_team_data,
+        # example_optimize_lineup,
+        # example_evaluate_waiver_wire,
+        # example_evaluate_trades,
+        # example_full_weekly_management,
+    ]
     
-    # Get team data
-    # await example_get_team_data()
-    
-    # Optimize lineup
-    # await example_optimize_lineup()
-    
-    # Evaluate waiver wire
-    # await example_evaluate_waiver_wire()
-    
-    # Evaluate trades
-    # await example_evaluate_trades()
-    
-    # Full weekly management
-    # await example_full_weekly_management()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = await asyncio.gather(
+        *(_run_limited(example, semaphore) for example in examples),
+        return_exceptions=True,
+    )
+    for example, result in zip(examples, results):
+        if isinstance(result, Exception):
+            logger.error(f"{example.__name__} failed: {result}")
+        else:
+            logger.info(f"{example.__name__} finished")
     
     print("\n" + "=" * 60)
     print("Examples completed. Uncomment functions in example_usage.py to run them.")
@@ -78,4 +91,12 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Run Fantasy Football Agent examples")
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=3,
+        help="Maximum number of examples running at once (default: 3)",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(max_concurrency=args.max_concurrency))
@@ -1,15 +1,25 @@
 """Main entry point for the Fantasy Football Agent."""
 import asyncio
+import importlib.util
 import logging
 import sys
 
-# Try importing ADK components
-try:
+
+def _module_available(name: str) -> bool:
+    """Locate a module without executing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        # Parent package (e.g. google) is missing entirely
+        return False
+
+
+# Probe for ADK once; its modules are only imported when present
+ADK_AVAILABLE = _module_available("google.adk")
+if ADK_AVAILABLE:
     from google import adk
     from google.adk.sessions import InMemorySessionService
-    ADK_AVAILABLE = True
-except ImportError:
-    ADK_AVAILABLE = False
+else:
     logging.warning("ADK Runner not available. Agent will run in standalone mode.")
 
 from app.agent import agent, root_agent, default_memory_service
@@ -7,17 +7,13 @@ It's designed to be run via cron or manually.
 """
 import asyncio
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 import uuid
-import warnings
 from datetime import datetime
 
-# Suppress asyncio cleanup warnings that occur during MCP session shutdown
-# These are harmless and occur due to the synchronous wrapper around async code
-warnings.filterwarnings('ignore', category=RuntimeWarning, module='asyncio')
-logging.getLogger('asyncio').setLevel(logging.CRITICAL)
-
 # Add project root to path
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
@@ -33,16 +29,27 @@ if not os.path.exists(log_dir):
     os.makedirs(log_dir)
 
 log_file = os.path.join(log_dir, f"daily_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+# Loggers only enqueue records; a background listener thread does the file and
+# stdout writes so the agent's event loop never blocks on I/O. The queue
+# handler formats each record, so the output handlers write it as-is.
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(
+    log_queue,
+    logging.FileHandler(log_file, delay=True),
+    logging.StreamHandler(sys.stdout),
+    respect_handler_level=True,
+)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[logging.handlers.QueueHandler(log_queue)]
 )
+log_listener.start()
 logger = logging.getLogger(__name__)
 
+# Number of agent events whose output is collected into one log record
+EVENT_LOG_BATCH_SIZE = 16
+
 DAILY_PROMPT = """
 Check on my Yahoo fantasy football team and do everything you need to so I can be in a good position for this week to win!  Do the following at a minimum:
 Update my lineup and move any players around into the correct positions based on my league's unique positions and scoring rules.
@@ -58,12 +65,19 @@ Keep in mind the following facts about my fantasy football league as you do all
 * IR positions do not count against roster positions for active players
 """
 
+# The prompt never changes, so its message is built once at import
+_DAILY_MESSAGE = types.Content(
+    role="user",
+    parts=[types.Part(text=DAILY_PROMPT)]
+)
+
 async def run_daily_task():
     """Run the daily agent task."""
     logger.info("=" * 80)
     logger.info("Starting daily agent run")
     logger.info("=" * 80)
     
+    runner = None
     try:
         # Create runner with in-memory session service
         session_service = InMemorySessionService()
@@ -88,33 +102,39 @@ async def run_daily_task():
         
         logger.info("Sending prompt to agent...")
         
-        # Create the message
-        message = types.Content(
-            role="user",
-            parts=[types.Part(text=DAILY_PROMPT)]
-        )
-        
-        # Run the agent (synchronous wrapper around async)
+        # Run the agent on this event loop so MCP sessions are opened and
+        # closed on the loop that owns them
         event_count = 0
-        for event in runner.run(
+        log_events = logger.isEnabledFor(logging.INFO)
+        pending_lines = []
+        async for event in runner.run_async(
             user_id=user_id,
             session_id=session_id,
-            new_message=message
+            new_message=_DAILY_MESSAGE
         ):
             event_count += 1
+            if not log_events:
+                continue
             
             # Log model responses
             if event.content and event.content.parts:
                 for part in event.content.parts:
                     if part.text:
-                        logger.info(f"Agent: {part.text[:200]}...")
+                        pending_lines.append(f"Agent: {part.text:.200}...")
             
             # Log function calls
             function_calls = event.get_function_calls()
             if function_calls:
                 for fc in function_calls:
-                    logger.info(f"Tool call: {fc.name}")
+                    pending_lines.append(f"Tool call: {fc.name}")
+            
+            # Emit agent output in batches rather than one record per line
+            if event_count % EVENT_LOG_BATCH_SIZE == 0 and pending_lines:
+                logger.info("\n".join(pending_lines))
+                pending_lines.clear()
         
+        if pending_lines:
+            logger.info("\n".join(pending_lines))
         logger.info(f"Processed {event_count} events")
         logger.info("=" * 80)
         logger.info("Daily run completed successfully")
@@ -123,7 +143,19 @@ async def run_daily_task():
     except Exception as e:
         logger.error(f"Error during daily run: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        # Write out league rules discovered during the run
+        await agent.aclose()
+        # Shut down MCP toolsets before the event loop closes (older ADK
+        # Runners have no close())
+        close = getattr(runner, "close", None)
+        if close is not None:
+            await close()
 
 if __name__ == "__main__":
     # Run the async task
-    asyncio.run(run_daily_task())
+    try:
+        asyncio.run(run_daily_task())
+    finally:
+        # Drain queued log records before the process exits
+        log_listener.stop()
@@ -1,4 +1,5 @@
 
+import importlib.util
 import sys
 import os
 
@@ -6,12 +7,21 @@ import os
 sys.path.append(os.getcwd())
 
 try:
-    from google.adk.agents import CallbackContext
-    print("Successfully imported CallbackContext")
-    print("ADK_CALLBACKS_AVAILABLE should be True")
-except ImportError as e:
-    print(f"Failed to import CallbackContext: {e}")
+    agents_spec = importlib.util.find_spec("google.adk.agents")
+except ModuleNotFoundError:
+    agents_spec = None
+
+if agents_spec is None:
+    print("Failed to import CallbackContext: google.adk.agents not found")
     print("ADK_CALLBACKS_AVAILABLE should be False")
+else:
+    try:
+        from google.adk.agents import CallbackContext
+        print("Successfully imported CallbackContext")
+        print("ADK_CALLBACKS_AVAILABLE should be True")
+    except ImportError as e:
+        print(f"Failed to import CallbackContext: {e}")
+        print("ADK_CALLBACKS_AVAILABLE should be False")
 
 try:
     from app.agent import ADK_CALLBACKS_AVAILABLE
@@ -0,0 +1,4 @@
+import os
+
+# app.utils.config requires an API key at import time; tests never call Gemini.
+os.environ.setdefault("GEMINI_API_KEY", "test-api-key")
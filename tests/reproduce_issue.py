@@ -45,15 +45,16 @@ class MockAgent:
         logger.info(f"Model response: {response}")
         
         # Check for function calls
-        if hasattr(response, 'candidates') and response.candidates:
-            candidate = response.candidates[0]
-            if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts'):
-                for part in candidate.content.parts:
-                    if hasattr(part, 'function_call'):
-                        logger.info(f"Function call detected: {part.function_call.name}")
-                        # In a real agent, this would execute the tool and continue
-                        # If the agent stops here, that's the bug
-                        return "Function call detected"
+        candidates = getattr(response, 'candidates', None)
+        if candidates:
+            content = getattr(candidates[0], 'content', None)
+            for part in getattr(content, 'parts', None) or ():
+                function_call = getattr(part, 'function_call', None)
+                if function_call is not None:
+                    logger.info(f"Function call detected: {function_call.name}")
+                    # In a real agent, this would execute the tool and continue
+                    # If the agent stops here, that's the bug
+                    return "Function call detected"
         
         return "No function call"
 
@@ -0,0 +1,420 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.tools import analysis_tools
+from app.utils.tools.analysis_tools import AnalysisTools
+
+TEAM_DATA = {
+    "team_name": "Touchdown Makers",
+    "record": {"wins": 3, "losses": 1},
+    "roster": [
+        {"name": "Player A", "position": "QB", "team": "KC", "status": "healthy"},
+        {"name": "Player B", "position": "WR", "team": "MIA", "status": "Q"},
+    ],
+}
+LEAGUE_SETTINGS = {
+    "scoring_type": "PPR",
+    "roster_positions": {"QB": 1, "WR": 2, "SUPERFLEX": 1, "BN": 5},
+}
+
+
+def trade_payload(should_accept, confidence):
+    return {
+        "should_accept": should_accept,
+        "reasoning": "PPR league",
+        "value_difference": "neutral",
+        "confidence": confidence,
+    }
+
+
+class FakeModel:
+    def __init__(self, payload):
+        self.payload = payload
+        self.prompts = []
+        self.configs = []
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        self.configs.append(kwargs.get("generation_config"))
+        return SimpleNamespace(text=json.dumps(self.payload))
+
+
+class SlowModel(FakeModel):
+    def __init__(self, payload, delay=0.01):
+        super().__init__(payload)
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return await super().generate_content_async(prompt, **kwargs)
+
+
+class FakeStreamResponse:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.read = 0
+
+    async def __aiter__(self):
+        while self.read < len(self.chunks):
+            text = self.chunks[self.read]
+            self.read += 1
+            if isinstance(text, Exception):
+                raise text
+            yield SimpleNamespace(text=text)
+
+    async def resolve(self):
+        async for _ in self:
+            pass
+
+
+class FakeStreamModel:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.responses = []
+
+    async def generate_content_async(self, prompt, **kwargs):
+        assert kwargs.get("stream") is True
+        self.responses.append(FakeStreamResponse(self.chunks))
+        return self.responses[-1]
+
+
+def use_model(monkeypatch, model):
+    for name in (
+        "_lineup_model", "_waiver_model", "_trade_model", "_propose_model",
+        "_waiver_strong_model", "_trade_strong_model",
+    ):
+        monkeypatch.setattr(analysis_tools, name, model)
+    return model
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    return use_model(monkeypatch, FakeModel(trade_payload(True, 0.9) | {"proposed_trades": []}))
+
+
+async def test_run_analyses_returns_results_in_job_order(fake_model):
+    tools = AnalysisTools()
+
+    results = await tools.run_analyses([
+        {"analysis": "evaluate_trade", "args": {"trade": {"trade_id": "t1"}}},
+        {"analysis": "propose_trades", "args": {"team_data": TEAM_DATA, "league_settings": LEAGUE_SETTINGS}},
+        {"analysis": "unknown"},
+        "evaluate_trade",
+        {"analysis": "evaluate_trade", "args": ["t1"]},
+    ])
+
+    assert results[0]["should_accept"] is True
+    assert results[1] == []
+    assert "Unknown analysis" in results[2]["error"]
+    assert "must be an object" in results[3]["error"]
+    assert "must be an object" in results[4]["error"]
+    assert len(fake_model.prompts) == 2
+
+
+async def test_run_all_returns_each_weekly_analysis(monkeypatch):
+    model = use_model(monkeypatch, FakeModel({
+        "recommended_changes": [], "changes_needed": False, "confidence": 0.9, "summary": "ok",
+        "should_pickup": False, "player_id": None, "drop_player_id": None,
+        "reasoning": "PPR league", "priority": "low", "proposed_trades": [],
+    }))
+
+    result = await AnalysisTools().run_all(TEAM_DATA, LEAGUE_SETTINGS, {}, {}, [], week=3)
+
+    assert result["lineup"]["changes_needed"] is False
+    assert result["waivers"]["should_pickup"] is False
+    assert result["proposed_trades"] == []
+    assert len(model.prompts) == 3
+
+
+def test_batch_analyses_are_registered_as_tools():
+    names = [tool.name for tool in AnalysisTools().get_tools()]
+
+    assert names[:2] == ["run_analyses", "run_all"]
+
+
+async def test_concurrent_calls_overlap_up_to_the_concurrency_limit(monkeypatch):
+    monkeypatch.setattr(analysis_tools.settings, "max_concurrent_llm", 2)
+    model = use_model(monkeypatch, SlowModel(trade_payload(True, 0.9)))
+    tools = AnalysisTools()
+
+    await asyncio.gather(*(tools.evaluate_trade({"trade_id": f"t{i}"}) for i in range(5)))
+
+    assert model.peak == 2
+
+
+def test_concurrency_limit_works_across_event_loops(monkeypatch):
+    monkeypatch.setattr(analysis_tools.settings, "max_concurrent_llm", 1)
+    model = use_model(monkeypatch, SlowModel(trade_payload(True, 0.9)))
+    tools = AnalysisTools()
+
+    async def contend(run):
+        return await asyncio.gather(
+            *(tools.evaluate_trade({"trade_id": f"{run}-{i}"}) for i in range(3))
+        )
+
+    for run in range(2):
+        results = asyncio.run(contend(run))
+        assert all("error" not in result for result in results)
+    assert model.peak == 1
+
+
+async def test_identical_trade_evaluations_share_one_request(fake_model):
+    tools = AnalysisTools()
+    trade = {"trade_id": "t1", "players_offered": ["a"], "players_requested": ["b"]}
+
+    first, second = await asyncio.gather(
+        tools.evaluate_trade(trade), tools.evaluate_trade(trade)
+    )
+    third = await tools.evaluate_trade(trade)
+
+    assert first == second == third
+    assert len(fake_model.prompts) == 1
+
+
+async def test_concurrent_callers_share_a_failed_answer_without_caching_it(monkeypatch):
+    model = use_model(monkeypatch, SlowModel({"should_accept": "maybe"}))
+    tools = AnalysisTools()
+    trade = {"trade_id": "t1"}
+
+    results = await asyncio.gather(*(tools.evaluate_trade(trade) for _ in range(3)))
+    assert all("error" in result for result in results)
+    # One fast attempt plus one escalation, shared by all three callers
+    assert len(model.prompts) == 2
+
+    await tools.evaluate_trade(trade)
+    assert len(model.prompts) == 4
+
+
+async def test_waiter_takes_over_when_the_first_caller_is_cancelled(monkeypatch):
+    model = use_model(monkeypatch, SlowModel(trade_payload(True, 0.9)))
+    tools = AnalysisTools()
+    trade = {"trade_id": "t1"}
+
+    first = asyncio.ensure_future(tools.evaluate_trade(trade))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(tools.evaluate_trade(trade))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == trade_payload(True, 0.9)
+    assert first.cancelled()
+    assert len(model.prompts) == 1
+
+
+async def test_low_confidence_trade_evaluation_escalates_to_strong_model(monkeypatch):
+    fast = use_model(monkeypatch, FakeModel(trade_payload(False, 0.4)))
+    strong = FakeModel(trade_payload(True, 0.9))
+    monkeypatch.setattr(analysis_tools, "_trade_strong_model", strong)
+
+    result = await AnalysisTools().evaluate_trade({"trade_id": "t1"})
+
+    assert result == trade_payload(True, 0.9)
+    assert len(fast.prompts) == len(strong.prompts) == 1
+
+
+def test_extract_json_finds_balanced_block():
+    text = 'Here you go:\n```json\n{"should_pickup": false}\n```'
+
+    begin, end = analysis_tools._extract_json(text)
+
+    assert text[begin:end] == '{"should_pickup": false}'
+    assert analysis_tools._extract_json("no json here") is None
+
+
+def test_extract_json_ignores_braces_inside_strings():
+    text = '{"reasoning": "use {WR} in FLEX", "confidence": 0.8} Done }'
+
+    assert analysis_tools._extract_json(text) == (0, text.index(" Done"))
+
+
+def test_parse_structured_accepts_fenced_json():
+    text = 'Here you go:\n```json\n' + json.dumps(trade_payload(True, 0.8)) + '\n```'
+
+    parsed = AnalysisTools()._parse_structured(text, analysis_tools.TradeEvaluation)
+
+    assert parsed == trade_payload(True, 0.8)
+
+
+async def test_schema_mismatch_returns_typed_error(monkeypatch):
+    use_model(monkeypatch, FakeModel({"should_accept": "maybe"}))
+
+    result = await AnalysisTools().evaluate_trade({"trade_id": "t1"})
+
+    assert result == {"error": "Response did not match TradeEvaluation", "schema": "TradeEvaluation"}
+
+
+async def test_optimize_lineup_requests_structured_json(monkeypatch):
+    payload = {"recommended_changes": [], "changes_needed": False, "confidence": 0.7, "summary": "ok"}
+    model = use_model(monkeypatch, FakeModel(payload))
+
+    result = await AnalysisTools().optimize_lineup(TEAM_DATA, LEAGUE_SETTINGS, {}, {}, week=3)
+
+    assert result == payload
+    assert model.configs[0].response_mime_type == "application/json"
+    assert model.configs[0].response_schema is analysis_tools.LineupDecision
+    assert model.configs[0].max_output_tokens == 800
+    assert "Format your response as JSON" not in model.prompts[0]
+    assert "You are analyzing" not in model.prompts[0]
+    assert model.prompts[0].startswith("\nLEAGUE SETTINGS:\nScoring Type: PPR\n")
+    assert "\nWEEK: 3\n" in model.prompts[0]
+
+
+async def test_stream_lineup_changes_yields_each_change_once_complete(monkeypatch):
+    use_model(monkeypatch, FakeStreamModel([
+        '{"recommended_changes": [{"player_id": "1", "reas',
+        'oning": "bye {week}"}, {"player_id"',
+        ': "2"}], "changes_needed": true}',
+    ]))
+
+    changes = [c async for c in AnalysisTools().stream_lineup_changes(TEAM_DATA, LEAGUE_SETTINGS, {}, {}, week=3)]
+
+    assert changes == [{"player_id": "1", "reasoning": "bye {week}"}, {"player_id": "2"}]
+
+
+async def test_stream_lineup_changes_drains_the_response_after_the_last_change(monkeypatch):
+    model = use_model(monkeypatch, FakeStreamModel([
+        '{"recommended_changes": [{"player_id": "1"}]',
+        ', "changes_needed": true, "confidence": 0.9}',
+    ]))
+
+    changes = [c async for c in AnalysisTools().stream_lineup_changes(TEAM_DATA, LEAGUE_SETTINGS, {}, {}, week=3)]
+
+    assert changes == [{"player_id": "1"}]
+    assert model.responses[0].read == 2
+
+
+async def test_stream_lineup_changes_raises_when_the_request_fails(monkeypatch):
+    use_model(monkeypatch, FakeStreamModel([
+        '{"recommended_changes": [{"player_id": "1"}, ',
+        RuntimeError("stream broke"),
+    ]))
+    changes = []
+
+    with pytest.raises(RuntimeError, match="stream broke"):
+        async for change in AnalysisTools().stream_lineup_changes(TEAM_DATA, LEAGUE_SETTINGS, {}, {}, week=3):
+            changes.append(change)
+
+    assert changes == [{"player_id": "1"}]
+
+
+def test_waiver_prompt_shows_top_projected_players():
+    pool = [{"name": f"P{i}", "position": "WR", "team": "NE", "projected_points": i % 25} for i in range(100)]
+
+    prompt = AnalysisTools()._build_waiver_prompt(pool, TEAM_DATA, LEAGUE_SETTINGS, {})
+
+    assert prompt.count("(WR) - NE") == analysis_tools.WAIVER_POOL_SIZE
+    assert "  - P24 (WR)" in prompt
+    assert "  - P0 (WR)" not in prompt
+
+
+def test_players_without_projections_rank_below_projected_ones():
+    size = analysis_tools.WAIVER_POOL_SIZE
+    pool = [{"name": "Lead", "projected_points": 5}]
+    pool += [{"name": f"U{i}"} for i in range(size)]
+    pool += [{"name": "Negative", "projected_points": -1}]
+
+    top = analysis_tools._top_available(pool)
+
+    assert [p["name"] for p in top[:2]] == ["Lead", "Negative"]
+    assert [p["name"] for p in top[2:]] == [f"U{i}" for i in range(size - 2)]
+
+
+def test_half_ppr_scoring_gets_the_half_ppr_notes():
+    preamble = analysis_tools._scoring_preamble("Half-PPR")
+
+    assert "This is a Half-PPR league" in preamble
+    assert "CRITICAL: This is a PPR" not in preamble
+
+
+def test_list_and_dict_roster_positions_render_the_same():
+    as_list = {
+        "scoring_type": "PPR",
+        "roster_positions": [
+            {"position": "QB", "count": 1}, {"position": "WR", "count": 2},
+            {"position": "SUPERFLEX"}, {"position": "BN", "count": 5},
+        ],
+    }
+
+    render = analysis_tools._render_league_settings
+    assert render(as_list) == render(LEAGUE_SETTINGS)
+
+
+def test_module_exports_a_single_analysis_tools_class():
+    from app.utils import tools
+
+    exported = [name for name, value in vars(analysis_tools).items() if value is AnalysisTools]
+
+    assert exported == ["AnalysisTools"]
+    assert tools.__all__.count("AnalysisTools") == 1
+    assert isinstance(analysis_tools.default_analysis_tools, AnalysisTools)
+
+
+async def test_gemini_is_configured_once(fake_model, monkeypatch):
+    calls = []
+    monkeypatch.setattr(analysis_tools.genai, "configure", lambda **kwargs: calls.append(kwargs))
+    analysis_tools._configure.cache_clear()
+    tools = AnalysisTools()
+
+    await tools.evaluate_trade({"trade_id": "t1"})
+    await tools.evaluate_trade({"trade_id": "t2"})
+
+    assert len(calls) == 1
+    analysis_tools._configure.cache_clear()
+
+
+async def test_each_tool_requests_its_own_response_schema(fake_model):
+    tools = AnalysisTools()
+
+    await tools.evaluate_waiver_wire([], TEAM_DATA, LEAGUE_SETTINGS, {})
+    await tools.evaluate_trade({"trade_id": "t1"})
+    await tools.propose_trades(TEAM_DATA, LEAGUE_SETTINGS)
+
+    schemas = [config.response_schema for config in fake_model.configs]
+    assert schemas[0] is analysis_tools.WaiverDecision
+    assert analysis_tools.TradeEvaluation in schemas
+    assert schemas[-1] is analysis_tools.TradeProposals
+    assert all(config.response_mime_type == "application/json" for config in fake_model.configs)
+
+
+async def test_repeated_lineup_optimization_is_served_from_cache(monkeypatch):
+    payload = {"recommended_changes": [], "changes_needed": False, "confidence": 0.7, "summary": "ok"}
+    model = use_model(monkeypatch, FakeModel(payload))
+    tools = AnalysisTools()
+
+    first = await tools.optimize_lineup(TEAM_DATA, LEAGUE_SETTINGS, {}, {}, week=3)
+    second = await tools.optimize_lineup(TEAM_DATA, LEAGUE_SETTINGS, {}, {}, week=3)
+    await tools.optimize_lineup(TEAM_DATA, LEAGUE_SETTINGS, {}, {}, week=4)
+
+    assert first == second == payload
+    assert len(model.prompts) == 2
+
+
+async def test_rate_limited_requests_are_retried(monkeypatch):
+    from google.api_core import exceptions as google_exceptions
+
+    class RateLimitedModel(FakeModel):
+        failures = 2
+
+        async def generate_content_async(self, prompt, **kwargs):
+            if self.failures:
+                self.failures -= 1
+                raise google_exceptions.ResourceExhausted("quota")
+            return await super().generate_content_async(prompt, **kwargs)
+
+    monkeypatch.setattr(analysis_tools, "LLM_RETRY_BASE_SECONDS", 0)
+    model = use_model(monkeypatch, RateLimitedModel(trade_payload(True, 0.9)))
+
+    result = await AnalysisTools().evaluate_trade({"trade_id": "t1"})
+
+    assert result == trade_payload(True, 0.9)
+    assert len(model.prompts) == 1
@@ -0,0 +1,49 @@
+from app.utils.config import settings
+from app.utils.tools.browser_tools import BrowserAutomationTools
+
+LEAGUE_URL = f"https://football.fantasysports.yahoo.com/f1/{settings.yahoo_league_id}"
+
+
+async def test_league_urls_are_built_once():
+    tools = BrowserAutomationTools()
+
+    navigated = await tools.navigate_to_yahoo_fantasy()
+    lineup = await tools.set_lineup([], week=3)
+    trade = await tools.propose_trade({})
+
+    assert navigated["url"] == LEAGUE_URL
+    assert lineup["url"] == f"{LEAGUE_URL}/team/roster?week=3"
+    assert trade["url"] == f"{LEAGUE_URL}/transactions/trade"
+
+
+def test_get_tools_reuses_the_same_wrappers():
+    tools = BrowserAutomationTools()
+
+    first = tools.get_tools()
+
+    assert tools.get_tools() is first
+    assert [tool.name for tool in first][:2] == ["set_lineup", "add_player"]
+
+
+async def test_results_keep_mcp_hints_but_omit_notes_by_default():
+    result = await BrowserAutomationTools().drop_player("p1")
+
+    assert result == {
+        "success": True,
+        "mcp_tools_used": [
+            "mcp_browsermcp_browser_navigate",
+            "mcp_browsermcp_browser_snapshot",
+            "mcp_browsermcp_browser_click",
+        ],
+        "url": f"{LEAGUE_URL}/team/roster",
+    }
+
+
+async def test_debug_output_includes_notes(monkeypatch):
+    monkeypatch.setattr(settings, "debug_browser_tool_output", True)
+
+    result = await BrowserAutomationTools().accept_trade("t1")
+
+    assert result["success"] is True
+    assert "mcp_browsermcp_browser_click" in result["mcp_tools_used"]
+    assert "note" in result
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+
+from app.utils import league_memory
+from app.utils.league_memory import LeagueRulesMemory
+
+LEAGUE_INFO = {
+    "scoring_type": "Half-PPR",
+    "roster_positions": [
+        {"position": "QB", "count": 1},
+        {"position": "WR", "count": 2},
+        {"position": "SUPERFLEX", "count": 1},
+        {"position": "BN", "count": 6},
+    ],
+    "num_teams": 12,
+    "league": "Friends League",
+}
+
+
+async def test_store_writes_memory_file_atomically(tmp_path):
+    memory = LeagueRulesMemory(storage_dir=str(tmp_path))
+
+    assert await memory.store_league_rules("123", LEAGUE_INFO)
+    await memory.flush()
+
+    with open(memory.memory_file) as f:
+        saved = json.load(f)
+    assert saved["123"]["scoring_type"] == "Half-PPR"
+    assert not memory.memory_file.with_suffix(".json.tmp").exists()
+
+
+async def test_rules_survive_reload(tmp_path):
+    memory = LeagueRulesMemory(storage_dir=str(tmp_path))
+    await memory.store_league_rules("123", LEAGUE_INFO)
+    await memory.flush()
+
+    reloaded = LeagueRulesMemory(storage_dir=str(tmp_path))
+
+    assert reloaded.has_league_rules("123")
+    assert reloaded.get_league_rules("123")["league_name"] == "Friends League"
+
+
+async def test_burst_of_stores_is_written_once(tmp_path, monkeypatch):
+    memory = LeagueRulesMemory(storage_dir=str(tmp_path))
+    saves = []
+    original_save = memory._save_memory
+    monkeypatch.setattr(memory, "_save_memory", lambda: saves.append(1) or original_save())
+
+    for league_id in ("1", "2", "3"):
+        await memory.store_league_rules(league_id, LEAGUE_INFO)
+    await memory.flush()
+
+    assert len(saves) == 1
+    with open(memory.memory_file) as f:
+        assert set(json.load(f)) == {"1", "2", "3"}
+
+
+async def test_clear_forgets_league(tmp_path):
+    memory = LeagueRulesMemory(storage_dir=str(tmp_path))
+    await memory.store_league_rules("123", LEAGUE_INFO)
+
+    memory.clear_league_rules("123")
+
+    assert not memory.has_league_rules("123")
+    assert memory.get_league_rules("123") is None
+    await memory.flush()
+
+
+async def test_format_rules_for_agent_uses_precomputed_positions(tmp_path):
+    memory = LeagueRulesMemory(storage_dir=str(tmp_path))
+    await memory.store_league_rules("123", LEAGUE_INFO)
+
+    formatted = memory.format_rules_for_agent("123")
+
+    assert "League: Friends League" in formatted
+    assert "  - QB: 1\n" in formatted
+    assert "  - WR: 2\n" in formatted
+    assert "SUPERFLEX: QBs are MUCH more valuable" in formatted
+    assert "Half-PPR League" in formatted
+    assert "BN" not in formatted
+    await memory.flush()
+
+
+async def test_raw_league_info_is_not_stored_twice(tmp_path):
+    memory = LeagueRulesMemory(storage_dir=str(tmp_path))
+    league_info = {**LEAGUE_INFO, "draft_type": "live"}
+    await memory.store_league_rules("123", league_info)
+
+    rules = memory.get_league_rules("123")
+
+    assert "raw_data" not in rules
+    assert rules["raw_extra"] == {"league": "Friends League", "draft_type": "live"}
+    raw = memory.get_raw_league_info("123")
+    assert raw["draft_type"] == "live"
+    assert raw["roster_positions"] == LEAGUE_INFO["roster_positions"]
+    await memory.flush()
+
+
+async def test_roster_split_is_precomputed_at_store_time(tmp_path):
+    memory = LeagueRulesMemory(storage_dir=str(tmp_path))
+    await memory.store_league_rules("123", LEAGUE_INFO)
+
+    precomputed = memory.get_league_rules("123")["_precomputed"]
+
+    assert precomputed == {
+        "position_counts": [("QB", 1), ("WR", 2), ("SUPERFLEX", 1)],
+        "bench_count": 6,
+        "scoring_flag": "half",
+    }
+    await memory.flush()
+
+
+async def test_stale_precomputed_flags_are_rebuilt_on_load(tmp_path):
+    stale = {**LEAGUE_INFO, "_precomputed": {"position_counts": [], "bench_count": 0, "scoring_flag": "ppr"}}
+    (tmp_path / ".league_rules_memory.json").write_text(json.dumps({"123": stale}))
+
+    memory = LeagueRulesMemory(storage_dir=str(tmp_path))
+
+    assert memory.get_league_rules("123")["_precomputed"]["scoring_flag"] == "half"
+    assert "Half-PPR League" in memory.format_rules_for_agent("123")
+    await memory.flush()
+
+
+async def test_flush_waits_for_a_save_already_in_progress(tmp_path, monkeypatch):
+    monkeypatch.setattr(league_memory, "SAVE_DEBOUNCE_SECONDS", 0)
+    memory = LeagueRulesMemory(storage_dir=str(tmp_path))
+    save = memory._save_memory
+    saving = []
+
+    def slow_save():
+        saving.append(True)
+        time.sleep(0.05)
+        save()
+        saving.pop()
+
+    memory._save_memory = slow_save
+    await memory.store_league_rules("123", LEAGUE_INFO)
+    await asyncio.sleep(0.01)
+    assert saving
+
+    await memory.flush()
+
+    assert not saving
+    assert "123" in json.loads(memory.memory_file.read_text())
+
+
+def test_pending_rules_are_saved_when_the_loop_ends(tmp_path):
+    memory = LeagueRulesMemory(storage_dir=str(tmp_path))
+
+    async def store():
+        await memory.store_league_rules("123", LEAGUE_INFO)
+
+    asyncio.run(store())
+
+    with open(memory.memory_file) as f:
+        assert "123" in json.load(f)
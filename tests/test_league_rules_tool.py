@@ -0,0 +1,27 @@
+from app.utils.league_memory import LeagueRulesMemory
+from app.utils.tools.league_rules_tool import LeagueRulesTool
+
+LEAGUE_INFO = {
+    "scoring_type": "PPR",
+    "roster_positions": [
+        {"position": "QB", "count": 1},
+        {"position": "BN", "count": 6},
+    ],
+    "league": "Friends League",
+}
+
+
+async def test_returned_rules_omit_internal_fields(tmp_path):
+    memory = LeagueRulesMemory(storage_dir=str(tmp_path))
+    tool = LeagueRulesTool(memory=memory)
+
+    stored = await tool.discover_and_store_league_rules(league_info=LEAGUE_INFO, league_id="123")
+    fetched = await tool.get_stored_league_rules("123")
+    searched = await tool.search_league_rules_memory("Friends")
+
+    for rules in (stored["rules"], fetched["rules"], searched["matches"][0]):
+        assert rules["scoring_type"] == "PPR"
+        assert "_precomputed" not in rules
+        assert "raw_extra" not in rules
+    assert "_precomputed" in memory.get_league_rules("123")
+    await memory.flush()
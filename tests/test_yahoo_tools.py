@@ -0,0 +1,38 @@
+import asyncio
+
+from app.utils.tools.yahoo_tools import YahooFantasyTools
+
+
+async def test_weekly_snapshot_fetches_concurrently(monkeypatch):
+    tools = YahooFantasyTools()
+    in_flight = 0
+    peak = 0
+
+    def slow(result):
+        async def call(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return result
+        return call
+
+    monkeypatch.setattr(tools, "get_team_data", slow({"team": "A"}))
+    monkeypatch.setattr(tools, "get_league_standings", slow([{"rank": 1}]))
+    monkeypatch.setattr(tools, "get_available_players", slow([]))
+
+    snapshot = await tools.get_weekly_snapshot(week=5)
+
+    assert peak == 3
+    assert snapshot["week"] == 5
+    assert snapshot["team_data"] == {"team": "A"}
+    assert snapshot["standings"] == [{"rank": 1}]
+    assert snapshot["matchup"]["week"] == 5
+
+
+async def test_weekly_snapshot_defaults_to_current_week():
+    snapshot = await YahooFantasyTools().get_weekly_snapshot()
+
+    assert snapshot["week"] == 1
+    assert snapshot["matchup"]["week"] == 1